@@ -1,3 +1,5 @@
+import sys
+
 def cross(chromosome_a: str, chromosome_b: str, cut_point: int) -> tuple[str, str]:
     assert len(chromosome_a) == len(chromosome_b)
     new_c_a = chromosome_a[:cut_point] + chromosome_b[cut_point:]
@@ -14,5 +16,25 @@ def main():
     print(new_c_a)
     print(new_c_b)
 
+# Reads records of four lines until the end of stdin, streaming, and writes every result to the same buffered stream.
+# cross() works the same on bytes, so the lines are never decoded.
+def main_batch():
+    lines = sys.stdin.buffer
+    out = sys.stdout.buffer
+    for header in lines:
+        if not header.strip():
+            continue
+        length = int(header)
+        chromosome_a = next(lines).rstrip(b"\r\n")
+        chromosome_b = next(lines).rstrip(b"\r\n")
+        assert length == len(chromosome_a) == len(chromosome_b)
+        cut_point = int(next(lines))
+        (new_c_a, new_c_b) = cross(chromosome_a, chromosome_b, cut_point)
+        out.write(b"%b\n%b\n" % (new_c_a, new_c_b))
+    out.flush()
+
 if __name__ == "__main__":
-    main()
+    if "--batch" in sys.argv[1:]:
+        main_batch()
+    else:
+        main()
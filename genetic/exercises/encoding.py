@@ -1,4 +1,5 @@
 from math import ceil, log2
+import sys
 
 def main():
     [a, b] = input().split()
@@ -35,5 +36,65 @@ def search(elem: float, intervals: list[tuple[float, float]]):
             return m
     return l
 
+# The start of interval i is a + i * d, computed the same way as in the interval table, so the results are identical.
+# search() finds the last interval starting at or before elem, clamped to the table, which is what these compute.
+def index_of(elem: float, a: float, d: float, count: int) -> int:
+    position = (elem - a) / d
+    index = min(int(position), count - 1) if position > 0 else 0
+    while index + 1 < count and a + (index + 1) * d <= elem:
+        index += 1
+    while index > 0 and a + index * d > elem:
+        index -= 1
+    return index
+
+def indexes_of(elems: list[float], a: float, d: float, count: int) -> list[int]:
+    import numpy as np
+    elems = np.array(elems, dtype=np.float64)
+    index = np.clip(np.floor((elems - a) / d), 0, count - 1).astype(np.int64)
+    while True:
+        up = (index + 1 < count) & (a + (index + 1) * d <= elems)
+        if not up.any():
+            break
+        index += up
+    while True:
+        down = (index > 0) & (a + index * d > elems)
+        if not down.any():
+            break
+        index -= down
+    return index.tolist()
+
+def main_bulk(use_numpy: bool):
+    tokens = sys.stdin.read().split()
+    [a, b] = [float(tokens[0]), float(tokens[1])]
+    precision = int(tokens[2])
+    queries = int(tokens[3])
+    bits = ceil(log2((b - a) * (10 ** precision)))
+    d = (b - a) / (2 ** bits)
+    count = 2 ** bits
+    commands = tokens[4:4 + 2 * queries:2]
+    arguments = tokens[5:5 + 2 * queries:2]
+    invalid = next((i for i, command in enumerate(commands) if command not in ("TO", "FROM")), None)
+    if invalid is not None:
+        commands = commands[:invalid]
+    to_queries = [float(arguments[i]) for i, command in enumerate(commands) if command == "TO"]
+    if use_numpy:
+        to_indexes = iter(indexes_of(to_queries, a, d, count))
+    else:
+        to_indexes = iter([index_of(elem, a, d, count) for elem in to_queries])
+    answers: list[str] = []
+    for command, argument in zip(commands, arguments):
+        if command == "TO":
+            answers.append(format(next(to_indexes), f"0{bits}b"))
+        else:
+            answers.append(str(a + int(argument, 2) * d))
+    sys.stdout.write("".join(answer + "\n" for answer in answers))
+    if invalid is not None:
+        sys.stdout.flush()
+        raise SystemExit(f"Invalid command: {tokens[4 + 2 * invalid]}")
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # --bulk reads all of stdin at once and answers without building the interval table, --numpy also vectorizes the TO queries
+    if "--bulk" in sys.argv[1:] or "--numpy" in sys.argv[1:]:
+        main_bulk("--numpy" in sys.argv[1:])
+    else:
+        main()
@@ -1,3 +1,5 @@
+import sys
+
 def mutate(chromosome: str, locations: list[int]) -> str:
     bits = list(chromosome)
     for x in locations:
@@ -5,6 +7,13 @@ def mutate(chromosome: str, locations: list[int]) -> str:
         bits[x] = '1' if bits[x] == '0' else '0'
     return ''.join(bits)
 
+# '0' and '1' only differ in the lowest bit, so a bit is flipped in place by XOR with 1, without converting to str.
+def mutate_bytes(chromosome: bytes, locations: list[int]) -> bytearray:
+    bits = bytearray(chromosome)
+    for x in locations:
+        bits[x] ^= 1
+    return bits
+
 def read_line() -> list[int]:
     return [int(token) for token in input().split()]
 
@@ -16,5 +25,21 @@ def main():
 #    assert changes == len(locations)
     print(mutate(chromosome, locations))
 
+# Reads records of three lines until the end of stdin, streaming, and writes every result to the same buffered stream.
+def main_batch():
+    lines = sys.stdin.buffer
+    out = sys.stdout.buffer
+    for header in lines:
+        if not header.strip():
+            continue
+        chromosome = next(lines).rstrip(b"\r\n")
+        locations = [int(token) for token in next(lines).split()]
+        out.write(mutate_bytes(chromosome, locations))
+        out.write(b"\n")
+    out.flush()
+
 if __name__ == "__main__":
-    main()
+    if "--batch" in sys.argv[1:]:
+        main_batch()
+    else:
+        main()
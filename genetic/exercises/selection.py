@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from itertools import accumulate
+import sys
 
 @dataclass
 class Coefficients:
@@ -19,16 +20,37 @@ def selection(c: Coefficients, chromosomes: list[float]) -> list[float]:
         interval_ends[i] /= total_fitness
     return interval_ends
 
-def read_line() -> list[float]:
-    return [float(token) for token in input().split()]
+# Same as selection, with every step done on whole arrays.
+# The prefix sums are compensated: the rounding error of each addition in cumsum is recovered exactly with the TwoSum trick,
+# and the accumulated errors are added back, so each end is close to the exactly rounded prefix sum.
+# Dividing by the last end makes it exactly 1.0.
+def selection_numpy(c: Coefficients, chromosomes: list[float]) -> list[float]:
+    import numpy as np
+    x = np.array(chromosomes, dtype=np.float64)
+    fitness = c.a * x**2 + c.b * x + c.c
+    assert (fitness >= 0).all()
+    sums = np.cumsum(fitness)
+    previous = np.concatenate(([0.0], sums[:-1]))
+    added = sums - previous
+    errors = (previous - (sums - added)) + (fitness - added)
+    interval_ends = np.concatenate(([0.0], sums + np.cumsum(errors)))
+    interval_ends /= interval_ends[-1]
+    return interval_ends.tolist()
 
-def main():
-    c = Coefficients(*read_line())
-    size = int(input())
-    chromosomes = read_line()
-    assert len(chromosomes) == size
-    for x in selection(c, chromosomes):
-        print(f"{x:.10f}")
+# Reads any number of test cases until the end of stdin, and writes all the answers at once.
+def main(use_numpy: bool):
+    tokens = sys.stdin.read().split()
+    position = 0
+    output: list[str] = []
+    while position < len(tokens):
+        c = Coefficients(*[float(token) for token in tokens[position:position + 3]])
+        size = int(tokens[position + 3])
+        chromosomes = [float(token) for token in tokens[position + 4:position + 4 + size]]
+        assert len(chromosomes) == size
+        position += 4 + size
+        ends = selection_numpy(c, chromosomes) if use_numpy else selection(c, chromosomes)
+        output.extend(f"{x:.10f}\n" for x in ends)
+    sys.stdout.write("".join(output))
 
 if __name__ == "__main__":
-    main()
+    main("--numpy" in sys.argv[1:])
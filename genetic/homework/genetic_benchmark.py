@@ -0,0 +1,220 @@
+"""
+Benchmarks for the genetic algorithm primitives in genetic_polynomial_max.py.
+
+Usage:
+
+> python genetic_benchmark.py --output benchmark.json
+
+Sweeps the population size, the decimal precision (which determines the number of bits) and the mutation chance,
+and reports operations per second for each primitive, generations per second for a full generation, and peak memory.
+The results are stored as JSON, and can be compared against a previous run to find regressions:
+
+> python genetic_benchmark.py --baseline benchmark.json --threshold 0.2
+
+The exit code is 1 if any benchmark is slower than the baseline by more than the threshold.
+
+It can also compare the genome encodings, by running many seeds of a configuration with each encoding,
+and reporting the mean number of generations needed to get within epsilon of the true maximum:
+
+> python genetic_benchmark.py --convergence genetic_polynomial_max.json --seeds 50 --epsilon 1e-6
+"""
+
+from argparse import ArgumentParser
+from dataclasses import dataclass, replace
+from itertools import accumulate
+from json import dumps, loads
+from pathlib import Path
+from platform import python_version
+from random import Random
+from time import perf_counter_ns
+from typing import Callable
+import sys
+import tracemalloc
+
+from genetic_polynomial_max import (Configuration, Discretize, Polynomial, crossover, evaluate_population, evolve_generation,
+                                    generate_population, mutate, run_quiet, search, select_gen_data)
+
+@dataclass
+class BenchmarkResult:
+    """
+    Result of one benchmark: items processed per second (chromosomes, values, or generations) and peak traced memory.
+    """
+    ops_per_sec: float
+    peak_bytes: int
+
+def measure(run: Callable[[], object], items: int, repeat: int, min_time_ns: int) -> BenchmarkResult:
+    """
+    Call run() in a loop for at least min_time_ns, repeat times, and keep the best rate, to reduce noise.
+    Peak memory is measured in a separate call with tracemalloc, since tracing slows everything down.
+    """
+    best = 0.0
+    for _ in range(repeat):
+        calls = 0
+        start = perf_counter_ns()
+        elapsed = 0
+        while elapsed < min_time_ns:
+            run()
+            calls += 1
+            elapsed = perf_counter_ns() - start
+        best = max(best, calls * items / (elapsed / 1e9))
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return BenchmarkResult(best, peak)
+
+def make_config(population_size: int, precision: int, mutation_chance: float) -> Configuration:
+    """
+    A configuration like the default one, with the swept parameters replaced.
+    """
+    return Configuration(population_size=population_size, domain_start=-10, domain_end=10, polynomial_terms=[(2, -1), (1, 1), (0, 2)],
+                         decimal_precision=precision, crossover_chance=0.2, mutation_chance=mutation_chance, generations=1,
+                         random_seed=2024, verbose_first_generation=False, copy_best_to_new_generation=True)
+
+def run_benchmarks(populations: list[int], precisions: list[int], mutation_chances: list[float], repeat: int, min_time_ns: int) -> dict[str, BenchmarkResult]:
+    """
+    Run every benchmark for every combination of parameters it depends on.
+    The keys name the benchmark and those parameters, so they can be matched against a baseline.
+    """
+    results: dict[str, BenchmarkResult] = {}
+    def bench(key: str, run: Callable[[], object], items: int):
+        if key in results:
+            return
+        results[key] = measure(run, items, repeat, min_time_ns)
+        print(f"{key}: {results[key].ops_per_sec:,.0f} ops/s, peak {results[key].peak_bytes:,} B", file=sys.stderr)
+
+    for precision in precisions:
+        d = Discretize(-10, 10, precision)
+        rng = Random(2024)
+        values = [rng.uniform(-10, 10) for _ in range(1000)]
+        encoded = [d.encode(v) for v in values]
+        bench(f"discretize_encode/precision={precision}", lambda: [d.encode(v) for v in values], len(values))
+        bench(f"discretize_decode/precision={precision}", lambda: [d.decode_float(e) for e in encoded], len(encoded))
+    for population_size in populations:
+        rng = Random(2024)
+        cumulative = list(accumulate(rng.random() for _ in range(population_size)))
+        points = [rng.uniform(0, cumulative[-1]) for _ in range(1000)]
+        bench(f"search/pop={population_size}", lambda: [search(p, cumulative) for p in points], len(points))
+        fitnesses = [rng.uniform(-100, 100) for _ in range(population_size)]
+        bench(f"select_gen_data/pop={population_size}", lambda: select_gen_data(fitnesses), population_size)
+        for precision in precisions:
+            d = Discretize(-10, 10, precision)
+            population = generate_population(population_size, rng, d)
+            pairs = list(zip(population[::2], population[1::2]))
+            bench(f"crossover/pop={population_size}/precision={precision}",
+                  lambda: [crossover(a, b, rng, d) for a, b in pairs], len(pairs))
+            for mutation_chance in mutation_chances:
+                cfg = make_config(population_size, precision, mutation_chance)
+                bench(f"mutate/pop={population_size}/precision={precision}/mutation={mutation_chance}",
+                      lambda: [mutate(c, mutation_chance, rng, d) for c in population], population_size)
+                poly = Polynomial(cfg.polynomial_terms)
+                def generation():
+                    pop_fitnesses = evaluate_population(poly, population)
+                    best = max(range(len(pop_fitnesses)), key=pop_fitnesses.__getitem__)
+                    new_population = evolve_generation(cfg, population, pop_fitnesses, population[best], rng, d)
+                    return evaluate_population(poly, new_population)
+                bench(f"generation/pop={population_size}/precision={precision}/mutation={mutation_chance}", generation, 1)
+    return results
+
+def compare(results: dict[str, BenchmarkResult], baseline: dict[str, BenchmarkResult], threshold: float) -> bool:
+    """
+    Print the ratio of each result to the baseline, and return whether any benchmark regressed by more than the threshold.
+    """
+    regressed = False
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        ratio = result.ops_per_sec / baseline[key].ops_per_sec
+        flag = ""
+        if ratio < 1 - threshold:
+            flag = " REGRESSION"
+            regressed = True
+        print(f"{key}: {ratio:.2f}x baseline{flag}")
+    return regressed
+
+def true_maximum(poly: Polynomial, begin: float, end: float) -> float:
+    """
+    Find the maximum of the polynomial on [begin, end] with a dense grid, refined by ternary search around the best grid point.
+    """
+    points = 10000
+    grid = [begin + (end - begin) * i / points for i in range(points + 1)]
+    best = max(range(len(grid)), key=lambda i: poly.eval(grid[i]))
+    low, high = grid[max(best - 1, 0)], grid[min(best + 1, points)]
+    for _ in range(200):
+        a = low + (high - low) / 3
+        b = high - (high - low) / 3
+        if poly.eval(a) < poly.eval(b):
+            low = a
+        else:
+            high = b
+    return max(poly.eval(grid[best]), poly.eval((low + high) / 2))
+
+@dataclass
+class ConvergenceResult:
+    """
+    Result of running many seeds with one encoding: how often the target was reached, and in how many generations on average.
+    Runs that never reach the target count as taking all the configured generations.
+    """
+    mean_generations: float
+    success_rate: float
+
+def encoding_convergence(cfg: Configuration, seeds: int, epsilon: float) -> dict[str, ConvergenceResult]:
+    """
+    Run the same seeds with each encoding, stopping as soon as the best fitness is within epsilon of the true maximum.
+    """
+    target = true_maximum(Polynomial(cfg.polynomial_terms), cfg.domain_start, cfg.domain_end) - epsilon
+    results: dict[str, ConvergenceResult] = {}
+    for encoding in ("binary", "gray"):
+        generations: list[int] = []
+        successes = 0
+        for seed in range(1, seeds + 1):
+            run_cfg = replace(cfg, encoding=encoding, random_seed=seed, stop_at_fitness=target, verbose_first_generation=False)
+            result = run_quiet(run_cfg)
+            if result.best_fitness >= target:
+                successes += 1
+                generations.append(result.generations_run)
+            else:
+                generations.append(cfg.generations)
+        results[encoding] = ConvergenceResult(sum(generations) / seeds, successes / seeds)
+        print(f"{encoding}: mean {results[encoding].mean_generations:.2f} generations, "
+              f"reached target in {results[encoding].success_rate:.0%} of runs", file=sys.stderr)
+    return results
+
+def main():
+    ap = ArgumentParser("python genetic_benchmark.py")
+    ap.add_argument("--populations", type=int, nargs='+', default=[100, 1000, 10000], help="Population sizes to sweep")
+    ap.add_argument("--precisions", type=int, nargs='+', default=[3, 6], help="Decimal precisions to sweep")
+    ap.add_argument("--mutation-chances", type=float, nargs='+', default=[0.001, 0.1], help="Mutation chances to sweep")
+    ap.add_argument("--repeat", type=int, default=3, help="Number of measurements per benchmark, the best is kept")
+    ap.add_argument("--min-time", type=float, default=0.2, help="Minimum duration of each measurement, in seconds")
+    ap.add_argument("--output", type=Path, default=None, help="Path to write the results to, as JSON")
+    ap.add_argument("--baseline", type=Path, default=None, help="Path to previous results to compare against")
+    ap.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown compared to the baseline that counts as a regression")
+    ap.add_argument("--convergence", type=Path, default=None,
+                    help="Instead of the primitives, compare the generations to reach the maximum with each encoding, for this configuration")
+    ap.add_argument("--seeds", type=int, default=30, help="Number of seeds per encoding for --convergence")
+    ap.add_argument("--epsilon", type=float, default=1e-6, help="Distance from the true maximum that counts as reaching it for --convergence")
+    args = ap.parse_args()
+    if args.convergence is not None:
+        cfg = Configuration(**loads(args.convergence.read_text(encoding='utf-8')))
+        convergence = encoding_convergence(cfg, args.seeds, args.epsilon)
+        document = {"python": python_version(), "convergence": {key: result.__dict__ for key, result in convergence.items()}}
+        if args.output is not None:
+            args.output.write_text(dumps(document, indent=4) + '\n', encoding='utf-8')
+        else:
+            print(dumps(document, indent=4))
+        return
+    results = run_benchmarks(args.populations, args.precisions, args.mutation_chances, args.repeat, int(args.min_time * 1e9))
+    document = {"python": python_version(), "results": {key: result.__dict__ for key, result in results.items()}}
+    if args.output is not None:
+        args.output.write_text(dumps(document, indent=4) + '\n', encoding='utf-8')
+    else:
+        print(dumps(document, indent=4))
+    if args.baseline is not None:
+        baseline_document = loads(args.baseline.read_text(encoding='utf-8'))
+        baseline = {key: BenchmarkResult(**result) for key, result in baseline_document["results"].items()}
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
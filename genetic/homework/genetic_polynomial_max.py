@@ -12,19 +12,44 @@ It can also be run with a custom configuration file via an argument:
 
 > python genetics_polynomial_max.py path/to/my_config.json > evolution.txt
 
+If checkpoints are enabled in the configuration, an interrupted run can be continued from the last checkpoint:
+
+> python genetics_polynomial_max.py path/to/my_config.json --resume >> evolution.txt
+
+Instead of the polynomial, the fitness can be a Python function given by import path ("module:function"),
+or an external program that reads one x value per line on stdin and writes one fitness per line on stdout.
+Each generation's distinct genomes are then evaluated as one batch, split into chunks across fitness_workers processes.
+
 This program was developed using Python 3.11.3 and has been tested on Windows and Linux.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from argparse import ArgumentParser
 from json import loads
-from math import ceil, log2, log10
+from math import ceil, log, log1p, log2, log10
 from random import Random
 from itertools import accumulate
+from collections import OrderedDict
+from heapq import heapify, heappop, heappush
+from multiprocessing import Pool, cpu_count
+from multiprocessing.pool import Pool as PoolType
+from importlib import import_module
+from subprocess import Popen, PIPE
 from textwrap import wrap
 from secrets import randbits
 from pprint import pprint
-from typing import Sequence
+from time import perf_counter_ns
+from typing import Callable, Sequence, TextIO
+from csv import writer as csv_writer
+from json import dumps
+from hashlib import sha256
+from struct import Struct
+from os import replace
+from io import StringIO
+from cProfile import Profile
+from pstats import Stats
+import tracemalloc
+import sys
 
 @dataclass
 class Configuration:
@@ -42,6 +67,40 @@ class Configuration:
     random_seed: The seed for the RNG, or 0 to get a random seed from the OS.
     verbose_first_generation: Whether to print verbose output for the first generation.
     copy_best_to_new_generation: Whether to add a unchanged copy of the best chromosome to each new generation.
+    engine: "python" for the original engine, or "numpy" for the vectorized engine (requires NumPy and no verbose output).
+    fitness_cache_size: Maximum number of genomes in the LRU fitness cache of the Python engine without islands, or 0 to disable it.
+    sparse_mutation: Whether to sample only the positions of flipped bits, instead of drawing a random number for every bit.
+    selection: "roulette" for binary search in the cumulative probabilities, "alias" for a Walker/Vose alias table (Python engine only),
+        or "sus" for stochastic universal sampling with a single random offset.
+    islands: The number of islands the population is split into, each evolved in a separate process, or 1 to disable the island model.
+    migration_interval: The number of generations between migrations in the island model.
+    migrants: The number of best chromosomes each island sends to its neighbours in a migration.
+    migration_topology: "ring" to send migrants to the next island, or "complete" to send them to every other island.
+        In the complete topology, migrants * (islands - 1) must be less than the size of an island.
+    output_format: "text" for the human-readable format, or "jsonl" / "csv" for one machine-readable record per generation.
+    verbosity: 0 to only output the final result, 1 to also output the best chromosome of every generation,
+        2 to also print the configuration and the initial population (text format only).
+        In the jsonl and csv formats, every record includes the diversity, which costs a sort of the population in the numpy engine.
+        The text format doesn't show the diversity, so it isn't calculated for the records.
+    stop_after_stagnant_generations: Stop early if the best fitness doesn't improve for this many generations, or 0 to disable.
+    stop_below_diversity: Stop early if the fraction of distinct genomes in the population falls below this, or 0 to disable.
+    stop_at_fitness: Stop early once the best fitness reaches this target, or null to disable.
+    checkpoint_interval: Write a checkpoint every this many generations (Python engine only), or 0 to disable.
+    checkpoint_path: The file the checkpoint is written to, and read from when resuming.
+    profile: Whether to time each phase of every generation and print a summary table at the end (Python and NumPy engines, without islands).
+    profile_generation: A generation to capture with cProfile or tracemalloc, or -1 to disable (without islands).
+    profile_capture: "cprofile" to capture function calls, or "tracemalloc" to capture memory allocations.
+    encoding: "binary" to encode the index of a value in plain binary, or "gray" to use Gray code, so that neighbouring values
+        differ by a single bit and mutation can refine a solution without crossing Hamming cliffs.
+    fitness_function: Import path of a Python function to use as the fitness instead of the polynomial, as "module:function",
+        or null. The function is called with a float x and returns a float.
+    fitness_command: An executable and its arguments to use as the fitness instead of the polynomial, or null.
+        It is started once per worker, reads one x per line on stdin, and writes one fitness per line on stdout, flushing after each chunk.
+    fitness_workers: The number of processes that evaluate a custom fitness (pool processes or command instances), 1 to evaluate inline.
+    fitness_chunk_size: The number of x values sent to a worker at once. Keep chunks small enough to fit in a pipe buffer for commands.
+    steady_state_replacements: Run a steady-state algorithm that replaces this many of the worst chromosomes per step,
+        or 0 for the generational algorithm. A generation is counted every population_size evaluations on average,
+        since a generation ends on a whole step and the extra evaluations count towards the next one (Python engine only).
     """
     population_size: int
     domain_start: float
@@ -54,6 +113,30 @@ class Configuration:
     random_seed: int
     verbose_first_generation: bool
     copy_best_to_new_generation: bool
+    engine: str = "python"
+    fitness_cache_size: int = 0
+    sparse_mutation: bool = False
+    selection: str = "roulette"
+    islands: int = 1
+    migration_interval: int = 5
+    migrants: int = 1
+    migration_topology: str = "ring"
+    output_format: str = "text"
+    verbosity: int = 2
+    stop_after_stagnant_generations: int = 0
+    stop_below_diversity: float = 0.0
+    stop_at_fitness: float | None = None
+    checkpoint_interval: int = 0
+    checkpoint_path: str = "genetic_polynomial_max.ckpt"
+    profile: bool = False
+    profile_generation: int = -1
+    profile_capture: str = "cprofile"
+    encoding: str = "binary"
+    fitness_function: str | None = None
+    fitness_command: list[str] | None = None
+    fitness_workers: int = 1
+    fitness_chunk_size: int = 256
+    steady_state_replacements: int = 0
 
     def __post_init__(self):
         """
@@ -67,70 +150,318 @@ class Configuration:
         assert 1 >= self.crossover_chance >= 0
         assert 1 >= self.mutation_chance >= 0
         assert self.generations >= 1
+        assert self.engine in ("python", "numpy")
+        assert self.fitness_cache_size >= 0
+        if self.fitness_cache_size > 0:
+            assert self.engine == "python" and self.islands == 1, "The fitness cache is only supported by the python engine without islands"
+        assert self.selection in ("roulette", "alias", "sus")
+        if self.engine == "numpy":
+            assert self.selection != "alias", "The numpy engine does not support alias table selection"
+        assert self.output_format in ("text", "jsonl", "csv")
+        assert self.verbosity in (0, 1, 2)
+        if self.output_format != "text":
+            assert not self.verbose_first_generation, "Verbose output is only available in the text format"
+        assert self.stop_after_stagnant_generations >= 0
+        assert 1 >= self.stop_below_diversity >= 0
+        assert self.checkpoint_interval >= 0
+        if self.checkpoint_interval > 0:
+            assert self.engine == "python" and self.islands == 1, "Checkpoints are only supported by the python engine without islands"
+        assert self.profile_capture in ("cprofile", "tracemalloc")
+        assert self.encoding in ("binary", "gray")
+        assert self.fitness_function is None or self.fitness_command is None, "Only one custom fitness can be used"
+        if self.fitness_function is not None:
+            assert ":" in self.fitness_function, "fitness_function must be given as module:function"
+        if self.fitness_command is not None:
+            assert len(self.fitness_command) >= 1
+        assert self.fitness_workers >= 1
+        assert self.fitness_chunk_size >= 1
+        if self.fitness_function is not None or self.fitness_command is not None:
+            assert self.engine == "python", "A custom fitness requires the python engine"
+        assert 0 <= self.steady_state_replacements < self.population_size
+        if self.steady_state_replacements > 0:
+            assert self.engine == "python" and self.islands == 1, "The steady-state algorithm requires the python engine without islands"
+            assert self.selection == "roulette", "The steady-state algorithm only supports roulette selection"
+            assert not self.verbose_first_generation, "The steady-state algorithm does not support verbose output"
+            assert self.checkpoint_interval == 0, "The steady-state algorithm does not support checkpoints"
+        assert self.islands >= 1
+        if self.islands > 1:
+            assert self.engine == "python", "The island model requires the python engine"
+            assert not self.verbose_first_generation, "The island model does not support verbose output"
+            assert self.population_size // self.islands >= 2
+            assert self.migration_interval >= 1
+            assert 0 <= self.migrants < self.population_size // self.islands
+            assert self.migration_topology in ("ring", "complete")
+            assert self.migration_topology == "ring" or self.migrants * (self.islands - 1) < self.population_size // self.islands, \
+                "In the complete topology, every island must keep at least one of its own chromosomes after a migration"
+            assert not self.stop_after_stagnant_generations and not self.stop_below_diversity and self.stop_at_fitness is None, \
+                "The island model does not support early stopping"
+            assert not self.profile and self.profile_generation == -1, "The island model does not support profiling"
+        if self.engine == "numpy":
+            assert not self.verbose_first_generation, "The numpy engine does not support verbose output"
 
-def parse_args() -> Configuration:
+def parse_args() -> tuple[Configuration, bool]:
     """
     Parse the configuration, either from the default file or from a custom location.
+    Also returns whether the run should be resumed from the checkpoint.
     """
     ap = ArgumentParser("python genetics_polynomial_max.py")
     ap.add_argument("config_JSON_path", type=str, default="genetic_polynomial_max.json", nargs='?')
-    config: str = ap.parse_args().config_JSON_path
+    ap.add_argument("--resume", action="store_true", default=False, help="Continue the run from the checkpoint in the configuration")
+    args = ap.parse_args()
+    config: str = args.config_JSON_path
     with open(config, "r", encoding='utf-8') as f:
-        return Configuration(**loads(f.read()))
+        return Configuration(**loads(f.read())), args.resume
 
 class Polynomial:
     """
     A polynomial function with integer exponents and float coefficients.
     Used as the fitness function for the genetic algorithm.
+    The terms are compiled once into a dense list of coefficients, so evaluation uses Horner's method instead of pow() per term.
+    The rounding differs from summing the terms, so fitness values can differ from the pow() sum in the last digits.
+    Negative exponents are handled by factoring out the lowest power of x.
     """
-    _terms: list[tuple[int, float]]
+    _coefficients: list[float]
+    _min_exponent: int
     def __init__(self, terms: list[tuple[int, float]]):
-        self._terms = terms
-    def eval(self, x: float):
+        exponents = [term[0] for term in terms]
+        self._min_exponent = min(0, min(exponents))
+        self._coefficients = [0.0] * (max(exponents) - self._min_exponent + 1)
+        for exponent, coefficient in terms:
+            self._coefficients[exponent - self._min_exponent] += coefficient
+    def eval(self, x):
         """
         Evaluate the polynomial at a floating point value x.
+        Only uses arithmetic operators, so x can also be a NumPy array to evaluate many values at once.
+        """
+        coefficients = self._coefficients
+        result = x * 0 + coefficients[-1]
+        for i in range(len(coefficients) - 2, -1, -1):
+            result = result * x + coefficients[i]
+        if self._min_exponent < 0:
+            result = result * x ** self._min_exponent
+        return result
+    def eval_many(self, values: list[float]) -> list[float]:
+        """
+        Evaluate the polynomial at many values, with the same interface as the custom fitness functions.
+        """
+        return [self.eval(x) for x in values]
+    def close(self):
+        """
+        Nothing to release, the polynomial is evaluated inline.
         """
-        return sum(pow(x, term[0]) * term[1] for term in self._terms)
 
-@dataclass
+def chunked(values: list[float], size: int) -> list[list[float]]:
+    """
+    Split a batch of values into consecutive chunks of at most size values.
+    """
+    return [values[i:i + size] for i in range(0, len(values), size)]
+
+class CallableFitness:
+    """
+    A fitness given by the import path of a Python function, as "module:function".
+    With more than one worker, batches are evaluated by a process pool, which is created on the first batch.
+    The function is sent to the pool by name, so it must be defined at the top level of an importable module.
+    """
+    _function: Callable[[float], float]
+    _workers: int
+    _chunk_size: int
+    _pool: PoolType | None
+    def __init__(self, path: str, workers: int, chunk_size: int):
+        module_name, _, attribute = path.partition(":")
+        function = import_module(module_name)
+        for name in attribute.split("."):
+            function = getattr(function, name)
+        self._function = function
+        self._workers = workers
+        self._chunk_size = chunk_size
+        self._pool = None
+    def eval(self, x: float) -> float:
+        """
+        Evaluate a single value inline, used for verbose output.
+        """
+        return self._function(x)
+    def eval_many(self, values: list[float]) -> list[float]:
+        """
+        Evaluate a batch of values, in the pool if there is more than one worker and more than one chunk.
+        """
+        if self._workers == 1 or len(values) <= self._chunk_size:
+            return [self._function(x) for x in values]
+        if self._pool is None:
+            self._pool = Pool(self._workers)
+        return self._pool.map(self._function, values, self._chunk_size)
+    def close(self):
+        """
+        Stop the worker processes, if they were started.
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+class CommandFitness:
+    """
+    A fitness computed by an external program, which is started once per worker and kept running for the whole run.
+    The protocol is line based: one x per line on stdin, answered by one fitness per line on stdout.
+    A batch is split into chunks, and a chunk is written to every worker before reading any answer, so the workers run in parallel.
+    """
+    _command: list[str]
+    _chunk_size: int
+    _processes: list[Popen]
+    def __init__(self, command: list[str], workers: int, chunk_size: int):
+        self._command = command
+        self._chunk_size = chunk_size
+        self._processes = [Popen(command, stdin=PIPE, stdout=PIPE, text=True, bufsize=1) for _ in range(workers)]
+    def eval(self, x: float) -> float:
+        """
+        Evaluate a single value with the first worker, used for verbose output.
+        """
+        return self.eval_many([x])[0]
+    def eval_many(self, values: list[float]) -> list[float]:
+        """
+        Evaluate a batch of values, one round of chunks (one chunk per worker) at a time.
+        """
+        results: list[float] = []
+        chunks = chunked(values, self._chunk_size)
+        for round_start in range(0, len(chunks), len(self._processes)):
+            busy = list(zip(self._processes, chunks[round_start:round_start + len(self._processes)]))
+            for process, chunk in busy:
+                try:
+                    process.stdin.write("".join(f"{x!r}\n" for x in chunk))
+                    process.stdin.flush()
+                except BrokenPipeError:
+                    self._exited(process)
+            for process, chunk in busy:
+                for _ in chunk:
+                    line = process.stdout.readline()
+                    if not line:
+                        self._exited(process)
+                    results.append(float(line))
+        return results
+    def _exited(self, process: Popen):
+        """
+        Report a worker that exited before answering every value it was sent.
+        """
+        raise RuntimeError(f"Fitness command {self._command} exited with code {process.wait()} before answering")
+    def close(self):
+        """
+        Close the input of every worker, so they can exit, and wait for them.
+        """
+        for process in self._processes:
+            process.stdin.close()
+        for process in self._processes:
+            process.wait()
+            process.stdout.close()
+
+Fitness = Polynomial | CallableFitness | CommandFitness
+
+def make_fitness(cfg: Configuration, workers: int | None = None) -> Fitness:
+    """
+    Build the fitness function selected by the configuration, the polynomial by default.
+    The number of workers can be overridden, for callers that already run in a worker process.
+    """
+    if workers is None:
+        workers = cfg.fitness_workers
+    if cfg.fitness_function is not None:
+        return CallableFitness(cfg.fitness_function, workers, cfg.fitness_chunk_size)
+    if cfg.fitness_command is not None:
+        return CommandFitness(cfg.fitness_command, workers, cfg.fitness_chunk_size)
+    return Polynomial(cfg.polynomial_terms)
+
 class Chromosome:
     """
-    A fixed precision number encoded as a binary string.
-    For convenience, both the value and the encoded string are stored at all times.
+    A fixed precision number encoded as an integer genome, the index of the value in the discretized domain.
+    For convenience, both the value and the genome are stored at all times.
+    The binary string is only built when it is needed for printing, to avoid allocating it for every new chromosome.
     """
+    __slots__ = ("value", "genome", "bits")
     value: float
-    encoded: str
+    genome: int
+    bits: int
+    def __init__(self, value: float, genome: int, bits: int):
+        self.value = value
+        self.genome = genome
+        self.bits = bits
+    @property
+    def encoded(self) -> str:
+        """
+        The genome formatted as a binary string, padded to the number of bits.
+        """
+        return f"{self.genome:0{self.bits}b}"
 
 class Discretize:
     """
     A class to encode and decode floating point numbers as fixed precision binary strings.
-    Creates and stores a list of all possible values in the range [begin, end] with the given precision.
-    The precision and interval cannot be too large, since the number of possible values grows exponentially.
+    The possible values are step * (i + 1) + begin for every index i, so they are computed on demand instead of being stored.
+    This keeps memory usage and startup time constant, so the precision is only limited by the number of bits.
+    The genome is either the index in plain binary, or the index in Gray code, where neighbouring values differ by a single bit.
     """
-    _steps: list[float]
+    _begin: float
+    _step: float
     _bits: int
-    def __init__(self, begin: float, end: float, precision: float):
+    _gray: bool
+    def __init__(self, begin: float, end: float, precision: float, gray: bool = False):
         bits = ceil(log2((end - begin) * (10 ** precision)))
         step = (end - begin) / (2 ** bits)
+        self._begin = begin
+        self._step = step
         self._bits = bits
-        self._steps = [step * (i + 1) + begin for i in range(2 ** bits)]
+        self._gray = gray
+    def value(self, index: int) -> float:
+        """
+        Get the floating point value for an index, using the same arithmetic as the original table of all values.
+        """
+        return self._step * (index + 1) + self._begin
+    def index(self, nr: float) -> int:
+        """
+        Find the smallest index such that nr <= value(index), the same result as a binary search in a table of all values.
+        The closed form estimate can be off by one due to rounding, so it is corrected by checking the neighbours.
+        """
+        last = 2 ** self._bits - 1
+        if nr > self.value(last):
+            raise ValueError("'nr' is greater than all possible values.")
+        index = min(max(ceil((nr - self._begin) / self._step) - 1, 0), last)
+        while index > 0 and nr <= self.value(index - 1):
+            index -= 1
+        while nr > self.value(index):
+            index += 1
+        return index
+    def genome(self, index: int) -> int:
+        """
+        Convert an index to a genome, in the encoding of this instance.
+        """
+        return index ^ (index >> 1) if self._gray else index
+    def genome_index(self, genome):
+        """
+        Convert a genome back to an index. Gray code is decoded with a prefix XOR in log2(bits) steps.
+        Only uses shifts and XOR, so genome can also be a NumPy array of genomes.
+        """
+        if not self._gray:
+            return genome
+        shift = 1
+        while shift < self._bits:
+            genome = genome ^ (genome >> shift)
+            shift <<= 1
+        return genome
+    def genome_value(self, genome):
+        """
+        Get the floating point value a genome encodes. Also works on a NumPy array of genomes.
+        """
+        return self.value(self.genome_index(genome))
     def encode(self, nr: float) -> str:
         """
-        Encode a floating point number as a fixed precision binary string, using the closest value in the list.
+        Encode a floating point number as a fixed precision binary string, using the closest value not less than it.
         """
-        index = search(nr, self._steps)
-        return f"{index:0{self._bits}b}"
+        return f"{self.genome(self.index(nr)):0{self._bits}b}"
     def decode_float(self, bits: str) -> float:
         """
         Decode a fixed precision binary string to a floating point number.
         """
-        index = int(bits, 2)
-        return self._steps[index]
-    def decode_chromo(self, bits: str) -> Chromosome:
+        return self.genome_value(int(bits, 2))
+    def decode_chromo(self, genome: int) -> Chromosome:
         """
-        Decode a fixed precision binary to a Chromosome dataclass, which keeps both the value and the encoded string.
+        Decode an integer genome to a Chromosome, which keeps both the value and the genome.
         """
-        return Chromosome(self.decode_float(bits), bits)
+        return Chromosome(self.genome_value(genome), genome, self._bits)
     def bits(self) -> int:
         """
         Get the number of bits used to encode the floating point numbers.
@@ -140,25 +471,53 @@ class Discretize:
 def mutate(c: Chromosome, bit_flip_chance: float, rng: Random, d: Discretize) -> Chromosome:
     """
     Mutate a chromosome by flipping each bit with a given chance.
+    The bits are visited from the most significant one, the same order as in the binary string, and flipped with one XOR.
     """
-    def maybe_flip(bit: str) -> str:
-        assert bit in ('0', '1')
+    flip_mask = 0
+    for position in range(c.bits - 1, -1, -1):
         if rng.random() < bit_flip_chance:
-            return '1' if bit == '0' else '0'
-        return bit
-    mutated = ''.join(map(maybe_flip, c.encoded))
-    return d.decode_chromo(mutated)
+            flip_mask |= 1 << position
+    if flip_mask == 0:
+        return c
+    return d.decode_chromo(c.genome ^ flip_mask)
+
+def mutate_population_sparse(population: list[Chromosome], bit_flip_chance: float, rng: Random, d: Discretize) -> list[Chromosome]:
+    """
+    Mutate a population by flipping each bit with a given chance, with the same distribution as calling mutate on every chromosome.
+    The genomes are treated as one long bit string, and the gaps between flipped bits are drawn from a geometric distribution,
+    so the number of random draws is proportional to the number of flipped bits, not the total number of bits.
+    """
+    bits = d.bits()
+    total_bits = len(population) * bits
+    if bit_flip_chance == 0:
+        return list(population)
+    log_keep = log1p(-bit_flip_chance) if bit_flip_chance < 1 else None
+    flip_masks: dict[int, int] = {}
+    position = -1
+    while True:
+        # number of bits skipped before the next flip, geometrically distributed
+        skip = 0 if log_keep is None else int(log(1.0 - rng.random()) / log_keep)
+        position += skip + 1
+        if position >= total_bits:
+            break
+        index, bit = divmod(position, bits)
+        flip_masks[index] = flip_masks.get(index, 0) | (1 << (bits - 1 - bit))
+    mutated = list(population)
+    for index, flip_mask in flip_masks.items():
+        mutated[index] = d.decode_chromo(mutated[index].genome ^ flip_mask)
+    return mutated
 
 def crossover(a: Chromosome, b: Chromosome, rng: Random, d: Discretize) -> tuple[Chromosome, Chromosome, int]:
     """
     Cross two chromosomes by swapping them after a random cut point.
+    The cut point counts bits from the most significant one, so the bits after it are the low bits selected by a mask.
     """
-    bits_a = a.encoded
-    bits_b = b.encoded
-    assert len(bits_a) == len(bits_b)
-    cut = rng.randint(0, len(bits_a))
-    new_a = bits_a[:cut] + bits_b[cut:]
-    new_b = bits_b[:cut] + bits_a[cut:]
+    assert a.bits == b.bits
+    cut = rng.randint(0, a.bits)
+    low_mask = (1 << (a.bits - cut)) - 1
+    high_mask = ~low_mask
+    new_a = (a.genome & high_mask) | (b.genome & low_mask)
+    new_b = (b.genome & high_mask) | (a.genome & low_mask)
     return d.decode_chromo(new_a), d.decode_chromo(new_b), cut
 
 @dataclass
@@ -170,13 +529,78 @@ class SelectionData:
     prob: list[float]
     cumulative_prob: list[float]
 
-def select_gen_data(p: Polynomial, population: list[Chromosome]) -> SelectionData:
+class FitnessCache:
+    """
+    A bounded LRU cache from genome to fitness.
+    Roulette selection and copying the best chromosome fill the population with duplicates,
+    so this avoids evaluating the same genome again when the fitness function is expensive.
+    """
+    _p: Fitness
+    _max_size: int
+    _cache: OrderedDict[int, float]
+    hits: int
+    misses: int
+    evictions: int
+    def __init__(self, p: Fitness, max_size: int):
+        assert max_size > 0
+        self._p = p
+        self._max_size = max_size
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    def eval_population(self, population: list[Chromosome]) -> list[float]:
+        """
+        Get the fitness of every chromosome, evaluating the genomes that are not in the cache as one batch.
+        A genome repeated in the population is only evaluated once, and counts as a hit after the first time.
+        """
+        fitnesses: dict[int, float] = {}
+        pending: dict[int, float] = {}
+        for c in population:
+            if c.genome in fitnesses or c.genome in pending:
+                self.hits += 1
+                continue
+            fitness = self._cache.get(c.genome)
+            if fitness is not None:
+                self._cache.move_to_end(c.genome)
+                self.hits += 1
+                fitnesses[c.genome] = fitness
+            else:
+                self.misses += 1
+                pending[c.genome] = c.value
+        for genome, fitness in zip(pending, self._p.eval_many(list(pending.values()))):
+            fitnesses[genome] = fitness
+            self._cache[genome] = fitness
+            if len(self._cache) > self._max_size:
+                self._cache.popitem(last=False)
+                self.evictions += 1
+        return [fitnesses[c.genome] for c in population]
+    def report(self) -> str:
+        """
+        Format the cache statistics for printing at the end of the run.
+        """
+        return f"Fitness cache: {self.hits} hits, {self.misses} misses, {self.evictions} evictions"
+
+def evaluate_population(p: Fitness, population: list[Chromosome], cache: FitnessCache | None = None) -> list[float]:
+    """
+    Calculate the fitness of each chromosome in the population, using the cache if there is one.
+    Called once per generation, the result is shared by everything that needs the fitness of the population.
+    The polynomial is evaluated inline, a custom fitness gets the distinct genomes of the generation as one batch.
+    """
+    if cache is not None:
+        return cache.eval_population(population)
+    if isinstance(p, Polynomial):
+        return [p.eval(x.value) for x in population]
+    distinct = {c.genome: c.value for c in population}
+    fitnesses = dict(zip(distinct, p.eval_many(list(distinct.values()))))
+    return [fitnesses[c.genome] for c in population]
+
+def select_gen_data(fitness: list[float]) -> SelectionData:
     """
     Calculate the cumulative probabilities of each chromosome in the population being selected, based on their fitness.
     Used to select chromosomes using the roulette method.
     Also returns the probabilities for verbose output in the first generation.
     """
-    fitness = [p.eval(x.value) for x in population]
     least_fitness = min(fitness)
     if least_fitness < 0:
         fitness = [f + (-least_fitness) for f in fitness]
@@ -203,10 +627,144 @@ def select_chromosomes(amount_to_select: int, population: list[Chromosome], cumu
             print(f"u={u}: Select chromosome {chosen}")
     return selected
 
+@dataclass
+class AliasTable:
+    """
+    Walker/Vose alias table for sampling from a discrete distribution with one random number per draw.
+    Column i is chosen uniformly, then either i itself is selected with probability threshold[i], or alias[i] is selected.
+    """
+    threshold: list[float]
+    alias: list[int]
+
+def build_alias_table(prob: list[float]) -> AliasTable:
+    """
+    Build an alias table from a list of probabilities in O(n) time, using Vose's algorithm.
+    """
+    n = len(prob)
+    scaled = [p * n for p in prob]
+    threshold = [1.0] * n
+    alias = list(range(n))
+    small = [i for i in range(n) if scaled[i] < 1.0]
+    large = [i for i in range(n) if scaled[i] >= 1.0]
+    while small and large:
+        s = small.pop()
+        l = large.pop()
+        threshold[s] = scaled[s]
+        alias[s] = l
+        scaled[l] = (scaled[l] + scaled[s]) - 1.0
+        if scaled[l] < 1.0:
+            small.append(l)
+        else:
+            large.append(l)
+    # anything left over is 1.0, up to rounding errors
+    return AliasTable(threshold, alias)
+
+def select_chromosomes_alias(amount_to_select: int, population: list[Chromosome], table: AliasTable, rng: Random, verbose: bool) -> list[Chromosome]:
+    """
+    Select chromosomes using an alias table, in O(1) time per selected chromosome.
+    The integer part of u * n picks the column, and the fractional part decides between the column and its alias.
+    If verbose is True, print the random number and the selected chromosome for each selection.
+    """
+    n = len(population)
+    selected: list[Chromosome] = []
+    for _ in range(amount_to_select):
+        u = rng.random()
+        scaled = u * n
+        column = min(int(scaled), n - 1)
+        chosen = column if scaled - column < table.threshold[column] else table.alias[column]
+        selected.append(population[chosen])
+        if verbose:
+            print(f"u={u}: Select chromosome {chosen}")
+    return selected
+
+def select_chromosomes_sus(amount_to_select: int, population: list[Chromosome], cumulative_prob: list[float], rng: Random, verbose: bool) -> list[Chromosome]:
+    """
+    Select chromosomes using stochastic universal sampling: evenly spaced pointers on the roulette, with a single random offset.
+    The pointers are increasing, so a single linear scan of the cumulative probabilities finds all of them.
+    If verbose is True, print each pointer and the selected chromosome.
+    """
+    selected: list[Chromosome] = []
+    spacing = 1.0 / amount_to_select
+    offset = rng.random() * spacing
+    if verbose:
+        print(f"u={offset / spacing}: Pointer offset {offset}, spacing {spacing}")
+    chosen = 0
+    for k in range(amount_to_select):
+        pointer = offset + k * spacing
+        while pointer > cumulative_prob[chosen]:
+            chosen += 1
+        selected.append(population[chosen])
+        if verbose:
+            print(f"pointer={pointer}: Select chromosome {chosen}")
+    return selected
+
+class FenwickTree:
+    """
+    A binary indexed tree over the fitnesses of the population, for roulette selection in the steady-state algorithm.
+    Replacing one weight, the total, and finding the chromosome under a roulette pointer all take O(log n),
+    instead of rebuilding the cumulative probabilities in O(n) after every replacement.
+    The weights are stored unshifted, and find() subtracts the shift from every weight it passes over,
+    so negative fitnesses are handled like select_gen_data does, without updating every weight when the least fitness changes.
+    """
+    _weights: list[float]
+    _tree: list[float]
+    _top: int
+    def __init__(self, weights: list[float]):
+        self._weights = list(weights)
+        n = len(self._weights)
+        # tree[i] holds the sum of the (i & -i) weights ending at weight i - 1, built in O(n) by pushing each node into its parent
+        self._tree = [0.0] + self._weights
+        for i in range(1, n + 1):
+            parent = i + (i & -i)
+            if parent <= n:
+                self._tree[parent] += self._tree[i]
+        self._top = 1 << (n.bit_length() - 1)
+    def __len__(self) -> int:
+        return len(self._weights)
+    def set(self, index: int, weight: float):
+        """
+        Replace the weight at an index.
+        """
+        delta = weight - self._weights[index]
+        self._weights[index] = weight
+        n = len(self._weights)
+        i = index + 1
+        while i <= n:
+            self._tree[i] += delta
+            i += i & -i
+    def total(self) -> float:
+        """
+        The sum of all the unshifted weights.
+        """
+        result = 0.0
+        i = len(self._weights)
+        while i > 0:
+            result += self._tree[i]
+            i -= i & -i
+        return result
+    def find(self, target: float, shift: float) -> int:
+        """
+        Find the first index where the cumulative sum of the shifted weights reaches target, like search() in the cumulative probabilities.
+        Descends the tree from the largest power of two, and every node it passes over covers exactly step weights.
+        """
+        n = len(self._weights)
+        position = 0
+        step = self._top
+        while step > 0:
+            candidate = position + step
+            if candidate <= n:
+                node = self._tree[candidate] - step * shift
+                if node < target:
+                    position = candidate
+                    target -= node
+            step >>= 1
+        # rounding errors can leave the target just past the total
+        return min(position, n - 1)
+
 def search(item: float, lst: list[float]):
     """
     Use efficient binary search to find the greatest index such that item <= lst[index], in a sorted list.
-    Used for roulette selection and for chromosome encoding.
+    Used for roulette selection.
     """
     if item > lst[-1]:
         raise ValueError("'item' is greater than all list elements.")
@@ -222,20 +780,238 @@ def search(item: float, lst: list[float]):
 
 def generate_population(amount: int, rng: Random, d: Discretize) -> list[Chromosome]:
     """
-    Generate a population of random chromosomes, stored as Chromosome dataclasses, evenly distributed in the discretized domain.
+    Generate a population of random chromosomes, evenly distributed in the discretized domain.
     """
-    bits = d.bits()
-    upper = 2 ** bits
-    def rand_bits():
-        nr = rng.randint(0, upper - 1)
-        return f"{nr:0{bits}b}"
-    return [d.decode_chromo(rand_bits()) for _ in range(amount)]
+    upper = 2 ** d.bits()
+    return [d.decode_chromo(rng.randint(0, upper - 1)) for _ in range(amount)]
+
+def format_chromosome(c: Chromosome, fitness: float) -> str:
+    """
+    Format a Chromosome for printing. Cannot be a __str__ method because it needs the fitness, which is not stored in the Chromosome.
+    """
+    return f"(encoded={c.encoded}, value={c.value}, fitness={fitness})"
+
+@dataclass
+class GenerationRecord:
+    """
+    Summary of one generation, the event that all output formats render.
+    Diversity is the fraction of distinct genomes in the population.
+    """
+    generation: int
+    best_encoded: str
+    best_value: float
+    best_fitness: float
+    mean_fitness: float
+    # None if the output format doesn't show it, so it isn't calculated for nothing
+    diversity: float | None
+
+def diversity(population: list[Chromosome]) -> float:
+    """
+    Calculate the fraction of distinct genomes in a population.
+    """
+    return len({c.genome for c in population}) / len(population)
+
+def generation_record(generation: int, population: list[Chromosome], fitnesses: list[float], with_diversity: bool) -> GenerationRecord:
+    """
+    Summarize a generation of the Python engine, using the fitness already calculated for it.
+    The diversity is only calculated if with_diversity is set, since the text format doesn't show it.
+    """
+    best = population[best_index(fitnesses)]
+    return GenerationRecord(generation, best.encoded, best.value, max(fitnesses), sum(fitnesses) / len(fitnesses),
+                            diversity(population) if with_diversity else None)
+
+class ConvergenceMonitor:
+    """
+    Checks the optional early stopping criteria from the configuration, once per generation.
+    The diversity is passed as a function, so it is only calculated if the diversity criterion is enabled.
+    """
+    _cfg: Configuration
+    _best_fitness: float | None
+    _stagnant_generations: int
+    def __init__(self, cfg: Configuration):
+        self._cfg = cfg
+        self._best_fitness = None
+        self._stagnant_generations = 0
+    def state(self) -> tuple[float | None, int]:
+        """
+        Get the state needed to continue monitoring after resuming from a checkpoint.
+        """
+        return self._best_fitness, self._stagnant_generations
+    def set_state(self, state: tuple[float | None, int]):
+        """
+        Restore the state saved by state().
+        """
+        self._best_fitness, self._stagnant_generations = state
+    def update(self, best_fitness: float, diversity: Callable[[], float]) -> str | None:
+        """
+        Record the best fitness of the current generation, and return the reason for stopping if any criterion is met.
+        """
+        cfg = self._cfg
+        if self._best_fitness is None or best_fitness > self._best_fitness:
+            self._best_fitness = best_fitness
+            self._stagnant_generations = 0
+        else:
+            self._stagnant_generations += 1
+        if cfg.stop_at_fitness is not None and best_fitness >= cfg.stop_at_fitness:
+            return f"reached target fitness {cfg.stop_at_fitness}"
+        if 0 < cfg.stop_after_stagnant_generations <= self._stagnant_generations:
+            return f"no improvement for {self._stagnant_generations} generations"
+        if cfg.stop_below_diversity > 0:
+            current_diversity = diversity()
+            if current_diversity < cfg.stop_below_diversity:
+                return f"diversity {current_diversity} below {cfg.stop_below_diversity}"
+        return None
+
+def early_stop_message(reason: str, generation: int, generations: int) -> str:
+    """
+    Format the message reporting which stopping criterion fired and how many generations it saved.
+    """
+    return f"Stopped early at generation {generation}: {reason}, saved {generations - generation} generations"
+
+class GenerationLog:
+    """
+    Writes one record per generation in the output format from the configuration, all through one buffered stream.
+    The text format renders the records the same way the program always printed the best chromosome of each generation.
+    Messages that aren't records go to the same stream in the text format, and to stderr otherwise, to keep the stream machine-readable.
+    """
+    _out: TextIO
+    _format: str
+    _verbosity: int
+    def __init__(self, out: TextIO, output_format: str, verbosity: int):
+        self._out = out
+        self._format = output_format
+        self._verbosity = verbosity
+        if output_format == "csv":
+            self._csv = csv_writer(out, lineterminator='\n')
+            self._csv.writerow(GenerationRecord.__dataclass_fields__.keys())
+    def wants(self, final: bool = False) -> bool:
+        """
+        Check if a record would be written, so it isn't calculated for nothing.
+        The record of the final generation is always written.
+        """
+        return self._verbosity >= 1 or final
+    def wants_diversity(self) -> bool:
+        """
+        Check if the records show the diversity, which the text format doesn't.
+        """
+        return self._format != "text"
+    def record(self, r: GenerationRecord, final: bool = False):
+        """
+        Write the record for a generation, if the verbosity allows it.
+        """
+        if not self.wants(final):
+            return
+        if self._format == "jsonl":
+            self._out.write(dumps(r.__dict__) + '\n')
+        elif self._format == "csv":
+            self._csv.writerow(r.__dict__.values())
+        else:
+            formatted = f"(encoded={r.best_encoded}, value={r.best_value}, fitness={r.best_fitness})"
+            if final:
+                self._out.write(f"\nBest chromosome after {r.generation} generations: {formatted}\n")
+            else:
+                self._out.write(f"Best chromosome: {formatted}\n")
+    def message(self, text: str):
+        """
+        Write a human-readable message that isn't a generation record.
+        """
+        if self._format == "text":
+            self._out.write(text + '\n')
+        else:
+            print(text, file=sys.stderr)
+    def flush(self):
+        self._out.flush()
 
-def format_chromosome(c: Chromosome, poly: Polynomial) -> str:
+class PhaseTimer:
     """
-    Format a Chromosome for printing. Cannot be a __str__ method because it needs the polynomial to calculate the fitness.
+    Measures the time spent in each phase of every generation, and counts events such as crossovers.
+    Each lap() adds the time since the previous lap to the named phase, so the phases must be marked in the order they run.
+    The engines take an optional timer and only call it if it's not None, so profiling costs nothing when disabled.
     """
-    return f"(encoded={c.encoded}, value={c.value}, fitness={poly.eval(c.value)})"
+    _last: int
+    _current: dict[str, int]
+    per_generation: list[dict[str, int]]
+    counts: dict[str, int]
+    def __init__(self):
+        self._last = perf_counter_ns()
+        self._current = {}
+        self.per_generation = []
+        self.counts = {}
+    def start(self):
+        """
+        Start timing a generation.
+        """
+        self._last = perf_counter_ns()
+    def lap(self, phase: str):
+        """
+        Add the time since the previous lap (or the start of the generation) to a phase.
+        """
+        now = perf_counter_ns()
+        self._current[phase] = self._current.get(phase, 0) + now - self._last
+        self._last = now
+    def count(self, name: str, amount: int = 1):
+        """
+        Add to an event counter.
+        """
+        self.counts[name] = self.counts.get(name, 0) + amount
+    def end_generation(self):
+        """
+        Store the times of the current generation and start a new one.
+        """
+        self.per_generation.append(self._current)
+        self._current = {}
+    def summary(self) -> str:
+        """
+        Format a table with the total, mean and maximum time per generation and the share of each phase, followed by the counters.
+        """
+        phases: list[str] = []
+        for times in self.per_generation:
+            phases += [phase for phase in times if phase not in phases]
+        generations = max(len(self.per_generation), 1)
+        totals = {phase: sum(times.get(phase, 0) for times in self.per_generation) for phase in phases}
+        total = max(sum(totals.values()), 1)
+        lines = [f"Phase timings over {len(self.per_generation)} generations:",
+                 f"{'phase':<20} {'total ms':>12} {'mean ms':>10} {'max ms':>10} {'share':>7}"]
+        for phase in phases:
+            worst = max(times.get(phase, 0) for times in self.per_generation)
+            lines.append(f"{phase:<20} {totals[phase] / 1e6:>12.3f} {totals[phase] / generations / 1e6:>10.3f} "
+                         f"{worst / 1e6:>10.3f} {totals[phase] / total:>7.1%}")
+        lines.append(f"{'total':<20} {total / 1e6:>12.3f} {total / generations / 1e6:>10.3f}")
+        for name, amount in self.counts.items():
+            lines.append(f"{name}: {amount}")
+        return '\n'.join(lines)
+
+class GenerationCapture:
+    """
+    Captures a single generation with cProfile (function calls) or tracemalloc (memory allocations).
+    """
+    _kind: str
+    _profile: Profile | None
+    def __init__(self, kind: str):
+        self._kind = kind
+        self._profile = None
+    def start(self):
+        if self._kind == "cprofile":
+            self._profile = Profile()
+            self._profile.enable()
+        else:
+            tracemalloc.start()
+    def stop(self) -> str:
+        """
+        Stop capturing and format a report of the top entries.
+        """
+        out = StringIO()
+        if self._profile is not None:
+            self._profile.disable()
+            Stats(self._profile, stream=out).sort_stats("cumulative").print_stats(20)
+            return out.getvalue().rstrip()
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        out.write(f"Peak traced memory: {peak} bytes\n")
+        for stat in snapshot.statistics("lineno")[:20]:
+            out.write(f"{stat}\n")
+        return out.getvalue().rstrip()
 
 def print_list_wrapped(title: str, items: Sequence[object], indent: str = '    '):
     """
@@ -247,114 +1023,664 @@ def print_list_wrapped(title: str, items: Sequence[object], indent: str = '    '
     print('\n'.join(lines))
     print("]")
 
-def main():
+def run_numpy_engine(cfg: Configuration, poly: Polynomial, d: Discretize, log: GenerationLog, timer: PhaseTimer | None = None):
     """
-    The main function of the program, which runs the genetic algorithm.
-    This function is very long, because of the need to print verbose output for the first generation.
-    It's hard to split into functions, when there is printing interleaved with everything else.
+    Run the genetic algorithm with the population stored as a NumPy uint64 array of genomes.
+    Each phase of a generation is a batched operation over the whole population instead of a loop over chromosomes.
+    Uses a NumPy Generator seeded from the configuration, so the results differ from the Python engine for the same seed.
+    The initial population is not printed, since this engine is meant for populations too large to print.
+    """
+    import numpy as np
+    bits = d.bits()
+    assert bits <= 63, "The numpy engine stores genomes in 64-bit integers"
+    rng = np.random.default_rng(cfg.random_seed if cfg.random_seed != 0 else randbits(64))
+
+    def fitness(genomes: "np.ndarray") -> "np.ndarray":
+        return poly.eval(d.genome_value(genomes))
+
+    # the diversity criterion and the record of a generation share one calculation, since it sorts the whole population
+    diversity_of: "np.ndarray | None" = None
+    last_diversity = 0.0
+
+    def diversity(genomes: "np.ndarray") -> float:
+        nonlocal diversity_of, last_diversity
+        if diversity_of is not genomes:
+            ordered = np.sort(genomes)
+            diversity_of = genomes
+            last_diversity = (1 + np.count_nonzero(ordered[1:] != ordered[:-1])) / len(genomes)
+        return last_diversity
+
+    def record(generation: int, genomes: "np.ndarray", fitnesses: "np.ndarray", final: bool = False):
+        if log.wants(final):
+            best_index = np.argmax(fitnesses)
+            best = d.decode_chromo(int(genomes[best_index]))
+            log.record(GenerationRecord(generation, best.encoded, best.value, float(fitnesses[best_index]),
+                                        float(fitnesses.mean()), diversity(genomes) if log.wants_diversity() else None), final)
+
+    population = rng.integers(0, 2 ** bits, size=cfg.population_size, dtype=np.uint64)
+    amount_to_select = cfg.population_size - 1 if cfg.copy_best_to_new_generation else cfg.population_size
+    one = np.uint64(1)
+    monitor = ConvergenceMonitor(cfg)
+    stop_reason = None
+    fitnesses = fitness(population)
+    generation = 0
+    for generation in range(cfg.generations):
+        fittest = np.argmax(fitnesses)
+        stop_reason = monitor.update(float(fitnesses[fittest]), lambda: diversity(population))
+        if stop_reason is not None:
+            break
+        capture = GenerationCapture(cfg.profile_capture) if generation == cfg.profile_generation else None
+        if capture is not None:
+            capture.start()
+        if timer is not None:
+            timer.start()
+        record(generation, population, fitnesses)
+        if timer is not None:
+            timer.lap("output")
+
+        shifted = fitnesses - min(fitnesses.min(), 0.0)
+        total_fitness = shifted.sum()
+        if total_fitness > 0:
+            cumulative_prob = np.cumsum(shifted / total_fitness)
+        else:
+            cumulative_prob = np.arange(1, len(shifted) + 1) / len(shifted)
+        cumulative_prob[-1] = 1.0
+        if cfg.selection == "sus":
+            pointers = (rng.random() + np.arange(amount_to_select)) / amount_to_select
+        else:
+            pointers = rng.random(amount_to_select)
+        selected = population[np.searchsorted(cumulative_prob, pointers, side='left')]
+        if timer is not None:
+            timer.lap("selection")
+
+        to_crossover = np.flatnonzero(rng.random(amount_to_select) <= cfg.crossover_chance)
+        rng.shuffle(to_crossover)
+        pairs = len(to_crossover) // 2
+        x, y = to_crossover[:pairs], to_crossover[pairs:2 * pairs]
+        cuts = rng.integers(0, bits + 1, size=pairs, dtype=np.uint64)
+        low_mask = (one << (np.uint64(bits) - cuts)) - one
+        high_mask = ~low_mask
+        genomes_x, genomes_y = selected[x], selected[y]
+        selected[x] = (genomes_x & high_mask) | (genomes_y & low_mask)
+        selected[y] = (genomes_y & high_mask) | (genomes_x & low_mask)
+        if timer is not None:
+            timer.lap("crossover")
+            timer.count("crossover pairs", pairs)
+
+        if cfg.mutation_chance > 0 and cfg.sparse_mutation:
+            total_bits = amount_to_select * bits
+            chunk = int(total_bits * cfg.mutation_chance * 1.1) + 16
+            flip_positions: list["np.ndarray"] = []
+            last_position = -1
+            while last_position < total_bits:
+                positions = last_position + np.cumsum(rng.geometric(cfg.mutation_chance, size=chunk))
+                flip_positions.append(positions)
+                last_position = int(positions[-1])
+            positions = np.concatenate(flip_positions)
+            positions = positions[positions < total_bits]
+            bit_shifts = (bits - 1 - positions % bits).astype(np.uint64)
+            np.bitwise_xor.at(selected, positions // bits, one << bit_shifts)
+        elif cfg.mutation_chance > 0:
+            for position in range(bits):
+                flips = rng.random(amount_to_select) < cfg.mutation_chance
+                selected ^= flips.astype(np.uint64) << np.uint64(position)
+        if timer is not None:
+            timer.lap("mutate")
+
+        if cfg.copy_best_to_new_generation:
+            selected = np.append(selected, population[fittest])
+        population = selected
+        fitnesses = fitness(population)
+        if timer is not None:
+            timer.lap("evaluate")
+            timer.end_generation()
+        if capture is not None:
+            log.message(f"Capture of generation {generation}:\n{capture.stop()}")
+    else:
+        generation = cfg.generations
+
+    record(generation, population, fitnesses, True)
+    if stop_reason is not None:
+        log.message(early_stop_message(stop_reason, generation, cfg.generations))
+
+def select_population(cfg: Configuration, amount_to_select: int, population: list[Chromosome], s_data: SelectionData, rng: Random, verbose: bool) -> list[Chromosome]:
+    """
+    Select chromosomes for the next generation with the selection strategy from the configuration.
+    """
+    if cfg.selection == "alias":
+        table = build_alias_table(s_data.prob)
+        if verbose:
+            print_list_wrapped("Alias table thresholds", table.threshold)
+            print_list_wrapped("Alias table aliases", table.alias)
+        return select_chromosomes_alias(amount_to_select, population, table, rng, verbose)
+    if cfg.selection == "sus":
+        return select_chromosomes_sus(amount_to_select, population, s_data.cumulative_prob, rng, verbose)
+    return select_chromosomes(amount_to_select, population, s_data.cumulative_prob, rng, verbose)
+
+def mutate_population(cfg: Configuration, selected: list[Chromosome], rng: Random, d: Discretize) -> list[Chromosome]:
+    """
+    Mutate every selected chromosome, sampling either every bit or only the flipped bits depending on the configuration.
+    """
+    if cfg.sparse_mutation:
+        return mutate_population_sparse(selected, cfg.mutation_chance, rng, d)
+    return [mutate(c, cfg.mutation_chance, rng, d) for c in selected]
+
+def crossover_population(cfg: Configuration, selected: list[Chromosome], rng: Random, d: Discretize) -> int:
+    """
+    Pick each selected chromosome for crossover with the configured chance, and cross them in random pairs, in place.
+    Returns the number of pairs.
+    """
+    to_crossover = [index for index in range(len(selected)) if rng.random() <= cfg.crossover_chance]
+    rng.shuffle(to_crossover)
+    if len(to_crossover) % 2 == 1:
+        to_crossover.pop()
+    for i in range(0, len(to_crossover) - 1, 2):
+        x, y = to_crossover[i], to_crossover[i + 1]
+        selected[x], selected[y], _ = crossover(selected[x], selected[y], rng, d)
+    return len(to_crossover) // 2
+
+def evolve_generation(cfg: Configuration, population: list[Chromosome], fitnesses: list[float], best: Chromosome, rng: Random, d: Discretize,
+                      timer: PhaseTimer | None = None) -> list[Chromosome]:
+    """
+    Run selection, crossover and mutation for one generation without printing anything, returning the new population.
+    Uses the random number generator in exactly the same order as the verbose version.
+    If a timer is given, each phase is timed.
+    """
+    amount_to_select = len(population) - 1 if cfg.copy_best_to_new_generation else len(population)
+    s_data = select_gen_data(fitnesses)
+    if timer is not None:
+        timer.lap("select_gen_data")
+    selected = select_population(cfg, amount_to_select, population, s_data, rng, False)
+    if timer is not None:
+        timer.lap("select_chromosomes")
+    pairs = crossover_population(cfg, selected, rng, d)
+    if timer is not None:
+        timer.lap("crossover")
+        timer.count("crossover pairs", pairs)
+    selected = mutate_population(cfg, selected, rng, d)
+    if timer is not None:
+        timer.lap("mutate")
+    if cfg.copy_best_to_new_generation:
+        selected.append(best)
+    return selected
+
+def evolve_generation_verbose(cfg: Configuration, population: list[Chromosome], fitnesses: list[float], best: Chromosome, rng: Random, d: Discretize, poly: Fitness) -> list[Chromosome]:
+    """
+    Same as evolve_generation, but prints every step, for the first generation.
+    This function is very long, because it's hard to split into functions when there is printing interleaved with everything else.
     """
-    cfg = parse_args()
-    pprint(cfg)
-    poly = Polynomial(cfg.polynomial_terms)
-    d = Discretize(cfg.domain_start, cfg.domain_end, cfg.decimal_precision)
-    rng = Random(cfg.random_seed if cfg.random_seed != 0 else randbits(64))
-    population = generate_population(cfg.population_size, rng, d)
-    verbose = cfg.verbose_first_generation
-    print("Generation 0 (initial population):")
     idx_pad = ceil(log10(len(population)))
     def pad(index: int) -> str:
         return f"{index + 1: >{idx_pad}}"
-    for i, c in enumerate(population):
-        print(f"{pad(i)}: {format_chromosome(c, poly)}")
+    amount_to_select = len(population) - 1 if cfg.copy_best_to_new_generation else len(population)
+
+    s_data = select_gen_data(fitnesses)
     print()
-    for i in range(cfg.generations):
-        fitnesses = [poly.eval(c.value) for c in population]
-        best_fitness_index = max(range(len(fitnesses)), key=fitnesses.__getitem__)
-        best = population[best_fitness_index]
-        amount_to_select = len(population)
-        print(f"Best chromosome: {format_chromosome(best, poly)}")
-        if cfg.copy_best_to_new_generation:
-            amount_to_select -= 1
+    print("Selection probabilities:")
+    for i, p in enumerate(s_data.prob):
+        print(f"Chromosome {pad(i)}: P={p}")
+    print_list_wrapped("Cumulative probabilities", s_data.cumulative_prob)
+    selected = select_population(cfg, amount_to_select, population, s_data, rng, True)
+    print()
+    print("Selected chromosomes:")
+    for i, c in enumerate(selected):
+        print(f"{pad(i)}: {format_chromosome(selected[i], poly.eval(selected[i].value))}")
 
-        s_data = select_gen_data(poly, population)
-        if verbose:
-            print()
-            print("Selection probabilities:")
-            for i, p in enumerate(s_data.prob):
-                print(f"Chromosome {pad(i)}: P={p}")
-            print_list_wrapped("Cumulative probabilities", s_data.cumulative_prob)
-        selected = select_chromosomes(amount_to_select, population, s_data.cumulative_prob, rng, verbose)
-        if verbose:
-            print()
-            print("Selected chromosomes:")
-            for i, c in enumerate(selected):
-                print(f"{pad(i)}: {format_chromosome(selected[i], poly)}")
+    to_crossover: list[int] = []
+    print()
+    print(f"Crossover probability = {cfg.crossover_chance}")
+    for index, chromo in enumerate(selected):
+        u = rng.random()
+        cross = u <= cfg.crossover_chance
+        if cross:
+            to_crossover.append(index)
+        print(f"{pad(index)}: {chromo.encoded} u={u}", end="")
+        print(" | Will crossover" if cross else "")
+    rng.shuffle(to_crossover)
+    if len(to_crossover) % 2 == 1:
+        c = to_crossover.pop()
+        print(f"Removed {c} from crossover list to have an even amount.")
 
-        to_crossover: list[int] = []
-        if verbose:
-            print()
-            print(f"Crossover probability = {cfg.crossover_chance}")
-        for index, chromo in enumerate(selected):
-            u = rng.random()
-            cross = u <= cfg.crossover_chance
-            if cross:
-                to_crossover.append(index)
-            if verbose:
-                print(f"{pad(index)}: {chromo.encoded} u={u}", end="")
-                print(" | Will crossover" if cross else "")
-        rng.shuffle(to_crossover)
-        if len(to_crossover) % 2 == 1:
-            c = to_crossover.pop()
-            if verbose:
-                print(f"Removed {c} from crossover list to have an even amount.")
-
-        for i in range(0, len(to_crossover) - 1, 2):
-            s = selected
-            x, y = to_crossover[i], to_crossover[i + 1]
-            orig_x, orig_y = s[x].encoded, s[y].encoded
-            s[x], s[y], cut = crossover(s[x], s[y], rng, d)
-            def print_with_cut(s: str, index: int, cut: int):
-                with_cut = s[:cut] + '|' + s[cut:]
-                print(f"  {pad(index)}: {with_cut}")
-            if verbose:
-                print(f"Crossing {x} and {y} at cut point {cut}:")
-                print(" Before:")
-                print_with_cut(orig_x, x, cut)
-                print_with_cut(orig_y, y, cut)
-                print(" After:")
-                print_with_cut(s[x].encoded, x, cut)
-                print_with_cut(s[y].encoded, y, cut)
+    def print_with_cut(s: str, index: int, cut: int):
+        with_cut = s[:cut] + '|' + s[cut:]
+        print(f"  {pad(index)}: {with_cut}")
+    for i in range(0, len(to_crossover) - 1, 2):
+        s = selected
+        x, y = to_crossover[i], to_crossover[i + 1]
+        orig_x, orig_y = s[x].encoded, s[y].encoded
+        s[x], s[y], cut = crossover(s[x], s[y], rng, d)
+        print(f"Crossing {x} and {y} at cut point {cut}:")
+        print(" Before:")
+        print_with_cut(orig_x, x, cut)
+        print_with_cut(orig_y, y, cut)
+        print(" After:")
+        print_with_cut(s[x].encoded, x, cut)
+        print_with_cut(s[y].encoded, y, cut)
 
-        if verbose:
-            print()
-            print("After crossover:")
-            for i, c in enumerate(selected):
-                print(f"{pad(i)}: {format_chromosome(c, poly)}")
+    print()
+    print("After crossover:")
+    for i, c in enumerate(selected):
+        print(f"{pad(i)}: {format_chromosome(c, poly.eval(c.value))}")
 
-            print()
-            print(f"Mutation probability = {cfg.mutation_chance}")
-        before_mutation = [c.encoded for c in selected]
-        selected = [mutate(c, cfg.mutation_chance, rng, d) for c in selected]
-        diff = [i for i in range(len(selected)) if before_mutation[i] != selected[i].encoded]
+    print()
+    print(f"Mutation probability = {cfg.mutation_chance}")
+    before_mutation = [c.genome for c in selected]
+    selected = mutate_population(cfg, selected, rng, d)
+    diff = [i for i in range(len(selected)) if before_mutation[i] != selected[i].genome]
+    print_list_wrapped("Changed chromosomes", diff)
+    print("Chromosomes after mutation:")
+    for i, c in enumerate(selected):
+        print(f"{pad(i)}: {format_chromosome(c, poly.eval(c.value))}")
+    print()
+    if cfg.copy_best_to_new_generation:
+        selected.append(best)
+        print(f"Added saved copy of best chromosome: {format_chromosome(best, poly.eval(best.value))}")
+    return selected
+
+def best_index(fitnesses: list[float]) -> int:
+    """
+    Get the index of the fittest chromosome, the first one if there are several.
+    """
+    return max(range(len(fitnesses)), key=fitnesses.__getitem__)
+
+@dataclass
+class IslandResult:
+    """
+    The state of an island after evolving it for one epoch, sent back from the worker process.
+    The genomes are sent instead of Chromosome objects, since they are smaller to pickle.
+    """
+    genomes: list[int]
+    fitnesses: list[float]
+    rng_state: tuple
+
+def evolve_island(cfg: Configuration, genomes: list[int], rng_state: tuple, generations: int) -> IslandResult:
+    """
+    Evolve one island for a number of generations, in a worker process.
+    The random number generator state is passed in and returned, so each island keeps its own reproducible stream across epochs.
+    """
+    # the islands already use every core, and pool processes can't start their own pools
+    poly = make_fitness(cfg, workers=1)
+    d = Discretize(cfg.domain_start, cfg.domain_end, cfg.decimal_precision, cfg.encoding == "gray")
+    rng = Random()
+    rng.setstate(rng_state)
+    population = [d.decode_chromo(genome) for genome in genomes]
+    fitnesses = evaluate_population(poly, population)
+    for _ in range(generations):
+        best = population[best_index(fitnesses)]
+        population = evolve_generation(cfg, population, fitnesses, best, rng, d)
+        fitnesses = evaluate_population(poly, population)
+    poly.close()
+    return IslandResult([c.genome for c in population], fitnesses, rng.getstate())
+
+def migrate(islands: list[IslandResult], migrants: int, topology: str):
+    """
+    Copy the best chromosomes of each island over the worst chromosomes of its neighbours, in place.
+    In the ring topology, island i sends to island i + 1. In the complete topology, every island sends to every other island.
+    All migrants are chosen before any island is modified, so the order of the islands doesn't matter.
+    At most len(island) - 1 chromosomes are replaced, so every island keeps its own best chromosome.
+    """
+    def ranked(island: IslandResult) -> list[int]:
+        return sorted(range(len(island.genomes)), key=island.fitnesses.__getitem__, reverse=True)
+    outgoing = [[(island.genomes[i], island.fitnesses[i]) for i in ranked(island)[:migrants]] for island in islands]
+    for target_index, target in enumerate(islands):
+        if topology == "ring":
+            incoming = outgoing[target_index - 1]
+        else:
+            incoming = [m for source_index, source in enumerate(outgoing) if source_index != target_index for m in source]
+        worst = ranked(target)[:0:-1]
+        for slot, (genome, fitness) in zip(worst, incoming):
+            target.genomes[slot] = genome
+            target.fitnesses[slot] = fitness
+
+def run_islands(cfg: Configuration, poly: Fitness, d: Discretize, log: GenerationLog):
+    """
+    Run the island model: the population is split into islands that evolve independently in a process pool,
+    and every migration_interval generations (an epoch) the best chromosomes migrate between islands.
+    Each island has its own random number generator, seeded from a master generator seeded with random_seed.
+    Records are written for the whole population after every epoch, instead of after every generation.
+    If the population doesn't split evenly, the first population_size % islands islands get one more chromosome.
+    """
+    master_rng = Random(cfg.random_seed if cfg.random_seed != 0 else randbits(64))
+    island_size, remainder = divmod(cfg.population_size, cfg.islands)
+    islands: list[IslandResult] = []
+    for island_index in range(cfg.islands):
+        rng = Random(master_rng.getrandbits(64))
+        population = generate_population(island_size + (island_index < remainder), rng, d)
+        islands.append(IslandResult([c.genome for c in population], evaluate_population(poly, population), rng.getstate()))
+
+    def record_global_best(generation: int):
+        final = generation == cfg.generations
+        if not log.wants(final):
+            return
+        population = [d.decode_chromo(genome) for island in islands for genome in island.genomes]
+        log.record(generation_record(generation, population, [f for island in islands for f in island.fitnesses], log.wants_diversity()), final)
+
+    record_global_best(0)
+    done = 0
+    epoch = 0
+    with Pool(min(cfg.islands, cpu_count())) as pool:
+        while done < cfg.generations:
+            generations = min(cfg.migration_interval, cfg.generations - done)
+            islands = pool.starmap(evolve_island, [(cfg, island.genomes, island.rng_state, generations) for island in islands])
+            done += generations
+            epoch += 1
+            if done < cfg.generations:
+                migrate(islands, cfg.migrants, cfg.migration_topology)
+            if cfg.verbosity >= 1:
+                log.message(f"Epoch {epoch} finished at generation {done}")
+            record_global_best(done)
+
+def run_steady_state(cfg: Configuration, poly: Fitness, d: Discretize, log: GenerationLog, timer: PhaseTimer | None = None):
+    """
+    Run the steady-state algorithm: each step selects steady_state_replacements parents by roulette, crosses and mutates them,
+    and the children replace the worst chromosomes of the population, so the best chromosome is always kept.
+    Parents are crossed in pairs, so for an odd steady_state_replacements one more parent is selected and its child is dropped.
+    The roulette weights are kept in a Fenwick tree and the worst chromosomes in a heap, so a step costs O(k log n) instead of O(n).
+    The heap entries of replaced chromosomes are left in place and skipped, using a stamp per slot.
+    Both structures are rebuilt every population_size evaluations, which also discards the rounding errors accumulated by the tree.
+    Records and stopping criteria are checked every population_size evaluations, counted as one generation.
+    A generation ends after the step that reaches population_size evaluations, and the extra evaluations count towards the next one.
+    """
+    start_time = perf_counter_ns()
+    n = cfg.population_size
+    k = cfg.steady_state_replacements
+    rng = Random(cfg.random_seed if cfg.random_seed != 0 else randbits(64))
+    cache = FitnessCache(poly, cfg.fitness_cache_size) if cfg.fitness_cache_size > 0 else None
+    population = generate_population(n, rng, d)
+    fitnesses = evaluate_population(poly, population, cache)
+    evaluations = n
+    stamps = [0] * n
+    # evaluations still owed to the generations so far, negative if the last step went over
+    owed = 0
+
+    def roulette(tree: FenwickTree, shift: float) -> int:
+        total = tree.total() - n * shift
+        if total <= 0:
+            return rng.randrange(n)
+        return tree.find(rng.random() * total, shift)
+
+    monitor = ConvergenceMonitor(cfg)
+    stop_reason = None
+    generation = 0
+    for generation in range(cfg.generations):
+        best_fitness_index = best_index(fitnesses)
+        stop_reason = monitor.update(fitnesses[best_fitness_index], lambda: diversity(population))
+        if stop_reason is not None:
+            break
+        capture = GenerationCapture(cfg.profile_capture) if generation == cfg.profile_generation else None
+        if capture is not None:
+            capture.start()
+        if timer is not None:
+            timer.start()
+        if log.wants():
+            log.record(generation_record(generation, population, fitnesses, log.wants_diversity()))
+        tree = FenwickTree(fitnesses)
+        worst = [(fitness, stamps[i], i) for i, fitness in enumerate(fitnesses)]
+        heapify(worst)
+        if timer is not None:
+            timer.lap("output_and_rebuild")
+        owed += n
+        steps = ceil(owed / k)
+        owed -= steps * k
+        for _ in range(steps):
+            while stamps[worst[0][2]] != worst[0][1]:
+                heappop(worst)
+            shift = min(worst[0][0], 0.0)
+            parents = [population[roulette(tree, shift)] for _ in range(k + k % 2)]
+            if timer is not None:
+                timer.lap("selection")
+            crossover_population(cfg, parents, rng, d)
+            children = mutate_population(cfg, parents[:k], rng, d)
+            if timer is not None:
+                timer.lap("crossover_and_mutate")
+            child_fitnesses = evaluate_population(poly, children, cache)
+            evaluations += k
+            if timer is not None:
+                timer.lap("evaluate")
+            replaced: list[int] = []
+            while len(replaced) < k:
+                _, stamp, i = heappop(worst)
+                if stamps[i] == stamp:
+                    replaced.append(i)
+            for i, child, fitness in zip(replaced, children, child_fitnesses):
+                population[i] = child
+                fitnesses[i] = fitness
+                stamps[i] += 1
+                tree.set(i, fitness)
+                heappush(worst, (fitness, stamps[i], i))
+            if timer is not None:
+                timer.lap("replace")
+        if timer is not None:
+            timer.count("fitness evaluations", steps * k)
+            timer.end_generation()
+        if capture is not None:
+            log.message(f"Capture of generation {generation}:\n{capture.stop()}")
+    else:
+        generation = cfg.generations
+
+    log.record(generation_record(generation, population, fitnesses, log.wants_diversity()), True)
+    if stop_reason is not None:
+        log.message(early_stop_message(stop_reason, generation, cfg.generations))
+    if cache is not None:
+        log.message(cache.report())
+    elapsed = (perf_counter_ns() - start_time) / 1e9
+    log.message(f"Steady state: {evaluations} evaluations in {elapsed:.3f} s, {evaluations / elapsed:,.0f} evaluations/s")
+
+# Fields that don't change the result of a run, so they can differ between the checkpointed run and the resumed run.
+RESUME_INDEPENDENT_FIELDS = ("verbose_first_generation", "fitness_cache_size", "output_format", "verbosity", "checkpoint_interval", "checkpoint_path",
+                             "profile", "profile_generation", "profile_capture", "fitness_workers", "fitness_chunk_size")
+# Random.getstate() holds the 624 words of the Mersenne Twister and the position in them.
+MT_STATE_WORDS = 625
+CHECKPOINT_MAGIC = b"GAPMCKPT"
+CHECKPOINT_VERSION = 1
+CHECKPOINT_HEADER = Struct("<8sH32sIIBd")
+CHECKPOINT_RNG = Struct(f"<B{MT_STATE_WORDS}IBd")
+
+def config_hash(cfg: Configuration) -> bytes:
+    """
+    Hash the fields of the configuration that determine the result of a run, to check a checkpoint belongs to it.
+    """
+    fields = {k: v for k, v in asdict(cfg).items() if k not in RESUME_INDEPENDENT_FIELDS}
+    return sha256(dumps(fields, sort_keys=True).encode('utf-8')).digest()
+
+@dataclass
+class Checkpoint:
+    """
+    Everything needed to continue a run of the Python engine exactly as if it wasn't interrupted.
+    generation is the index of the population, i.e. the number of generations already run.
+    """
+    generation: int
+    genomes: list[int]
+    rng_state: tuple
+    monitor_state: tuple[float | None, int]
+
+def save_checkpoint(path: str, cfg: Configuration, d: Discretize, checkpoint: Checkpoint):
+    """
+    Write a checkpoint in a compact binary format: a fixed header, the Mersenne Twister state, then the genomes as fixed-width integers.
+    The file is written next to the destination and then renamed, so a run killed while writing doesn't corrupt the last checkpoint.
+    """
+    best_fitness, stagnant_generations = checkpoint.monitor_state
+    header = CHECKPOINT_HEADER.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION, config_hash(cfg), checkpoint.generation,
+                                    stagnant_generations, best_fitness is not None, best_fitness if best_fitness is not None else 0.0)
+    rng_version, mt_state, gauss_next = checkpoint.rng_state
+    rng = CHECKPOINT_RNG.pack(rng_version, *mt_state, gauss_next is not None, gauss_next if gauss_next is not None else 0.0)
+    genome_bytes = (d.bits() + 7) // 8
+    genomes = b''.join(genome.to_bytes(genome_bytes, 'little') for genome in checkpoint.genomes)
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(header + rng + len(checkpoint.genomes).to_bytes(4, 'little') + genomes)
+    replace(temp_path, path)
+
+def load_checkpoint(path: str, cfg: Configuration, d: Discretize) -> Checkpoint:
+    """
+    Read a checkpoint written by save_checkpoint, checking it was written for the same configuration.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, saved_hash, generation, stagnant_generations, has_best, best_fitness = CHECKPOINT_HEADER.unpack_from(data, 0)
+    if magic != CHECKPOINT_MAGIC or version != CHECKPOINT_VERSION:
+        raise ValueError(f"{path} is not a checkpoint written by this version of the program")
+    if saved_hash != config_hash(cfg):
+        raise ValueError(f"{path} was written for a different configuration")
+    offset = CHECKPOINT_HEADER.size
+    rng_fields = CHECKPOINT_RNG.unpack_from(data, offset)
+    offset += CHECKPOINT_RNG.size
+    rng_state = (rng_fields[0], tuple(rng_fields[1:1 + MT_STATE_WORDS]), rng_fields[-1] if rng_fields[-2] else None)
+    count = int.from_bytes(data[offset:offset + 4], 'little')
+    offset += 4
+    genome_bytes = (d.bits() + 7) // 8
+    genomes = [int.from_bytes(data[i:i + genome_bytes], 'little') for i in range(offset, offset + count * genome_bytes, genome_bytes)]
+    return Checkpoint(generation, genomes, rng_state, (best_fitness if has_best else None, stagnant_generations))
+
+@dataclass
+class RunResult:
+    """
+    Summary of a run without output, used by the batch runner.
+    best_generation is the first generation in which the best chromosome was found, 0 being the initial population.
+    generations_run is less than the configured amount if a stopping criterion fired.
+    """
+    best_encoded: str
+    best_value: float
+    best_fitness: float
+    best_generation: int
+    generations_run: int
+    elapsed_ns: int
+
+def run_quiet(cfg: Configuration, workers: int | None = None) -> RunResult:
+    """
+    Run the genetic algorithm with the Python engine without printing anything, and summarize the result.
+    Uses the random number generator in the same order as main(), so the best chromosome is the same for the same seed.
+    Only the generational algorithm is supported, not the numpy engine, the island model or the steady-state algorithm.
+    The number of fitness workers can be overridden like in make_fitness, for callers that already run in a pool process.
+    """
+    assert cfg.engine == "python" and cfg.islands == 1 and cfg.steady_state_replacements == 0, \
+        "run_quiet only runs the generational python engine"
+    start_time = perf_counter_ns()
+    poly = make_fitness(cfg, workers)
+    d = Discretize(cfg.domain_start, cfg.domain_end, cfg.decimal_precision, cfg.encoding == "gray")
+    rng = Random(cfg.random_seed if cfg.random_seed != 0 else randbits(64))
+    population = generate_population(cfg.population_size, rng, d)
+    cache = FitnessCache(poly, cfg.fitness_cache_size) if cfg.fitness_cache_size > 0 else None
+    fitnesses = evaluate_population(poly, population, cache)
+    best_fitness_index = best_index(fitnesses)
+    overall_best, overall_best_fitness, overall_best_generation = population[best_fitness_index], fitnesses[best_fitness_index], 0
+    monitor = ConvergenceMonitor(cfg)
+    generation = 0
+    for generation in range(1, cfg.generations + 1):
+        if monitor.update(fitnesses[best_fitness_index], lambda: diversity(population)) is not None:
+            generation -= 1
+            break
+        population = evolve_generation(cfg, population, fitnesses, population[best_fitness_index], rng, d)
+        fitnesses = evaluate_population(poly, population, cache)
+        best_fitness_index = best_index(fitnesses)
+        if fitnesses[best_fitness_index] > overall_best_fitness:
+            overall_best, overall_best_fitness, overall_best_generation = population[best_fitness_index], fitnesses[best_fitness_index], generation
+    poly.close()
+    return RunResult(overall_best.encoded, overall_best.value, overall_best_fitness, overall_best_generation, generation, perf_counter_ns() - start_time)
+
+def main():
+    """
+    The main function of the program, which runs the genetic algorithm.
+    The first generation can be verbose, further generations only print the best chromosome.
+    """
+    cfg, resume = parse_args()
+    log = GenerationLog(sys.stdout, cfg.output_format, cfg.verbosity)
+    print_text = cfg.output_format == "text" and cfg.verbosity >= 2
+    if print_text:
+        pprint(cfg)
+    poly = make_fitness(cfg)
+    d = Discretize(cfg.domain_start, cfg.domain_end, cfg.decimal_precision, cfg.encoding == "gray")
+    timer = PhaseTimer() if cfg.profile else None
+    if cfg.engine == "numpy":
+        run_numpy_engine(cfg, poly, d, log, timer)
+        if timer is not None:
+            log.message(timer.summary())
+        log.flush()
+        return
+    if cfg.islands > 1:
+        run_islands(cfg, poly, d, log)
+        poly.close()
+        log.flush()
+        return
+    if cfg.steady_state_replacements > 0:
+        run_steady_state(cfg, poly, d, log, timer)
+        poly.close()
+        if timer is not None:
+            log.message(timer.summary())
+        log.flush()
+        return
+    rng = Random(cfg.random_seed if cfg.random_seed != 0 else randbits(64))
+    cache = FitnessCache(poly, cfg.fitness_cache_size) if cfg.fitness_cache_size > 0 else None
+    monitor = ConvergenceMonitor(cfg)
+    start_generation = 0
+    if resume:
+        checkpoint = load_checkpoint(cfg.checkpoint_path, cfg, d)
+        population = [d.decode_chromo(genome) for genome in checkpoint.genomes]
+        rng.setstate(checkpoint.rng_state)
+        monitor.set_state(checkpoint.monitor_state)
+        start_generation = checkpoint.generation
+        log.message(f"Resumed from {cfg.checkpoint_path} at generation {start_generation}")
+    else:
+        population = generate_population(cfg.population_size, rng, d)
+    verbose = cfg.verbose_first_generation and not resume
+    fitnesses = evaluate_population(poly, population, cache)
+    if print_text and not resume:
+        print("Generation 0 (initial population):")
+        idx_pad = ceil(log10(len(population)))
+        for i, c in enumerate(population):
+            print(f"{i + 1: >{idx_pad}}: {format_chromosome(c, fitnesses[i])}")
+        print()
+    stop_reason = None
+    generation = start_generation
+    for generation in range(start_generation, cfg.generations):
+        best_fitness_index = best_index(fitnesses)
+        best = population[best_fitness_index]
+        stop_reason = monitor.update(fitnesses[best_fitness_index], lambda: diversity(population))
+        if stop_reason is not None:
+            break
+        capture = GenerationCapture(cfg.profile_capture) if generation == cfg.profile_generation else None
+        if capture is not None:
+            capture.start()
+        if timer is not None:
+            timer.start()
+        if log.wants():
+            log.record(generation_record(generation, population, fitnesses, log.wants_diversity()))
+        if timer is not None:
+            timer.lap("output")
         if verbose:
-            print_list_wrapped("Changed chromosomes", diff)
-            print("Chromosomes after mutation:")
-            for i, c in enumerate(selected):
-                print(f"{pad(i)}: {format_chromosome(c, poly)}")
-            print()
-        if cfg.copy_best_to_new_generation:
-            selected.append(best)
-            if verbose:
-                print(f"Added saved copy of best chromosome: {format_chromosome(best, poly)}")
-        population = selected
+            population = evolve_generation_verbose(cfg, population, fitnesses, best, rng, d, poly)
+            if timer is not None:
+                timer.lap("verbose_generation")
+        else:
+            population = evolve_generation(cfg, population, fitnesses, best, rng, d, timer)
+        fitnesses = evaluate_population(poly, population, cache)
+        if timer is not None:
+            timer.lap("evaluate")
+            timer.count("fitness evaluations", len(population))
         if verbose:
             verbose = False
             print()
             print("Further generations will only print the best chromosome.")
+        if cfg.checkpoint_interval > 0 and (generation + 1) % cfg.checkpoint_interval == 0:
+            save_checkpoint(cfg.checkpoint_path, cfg, d, Checkpoint(generation + 1, [c.genome for c in population], rng.getstate(), monitor.state()))
+            if timer is not None:
+                timer.lap("checkpoint")
+        if timer is not None:
+            timer.end_generation()
+        if capture is not None:
+            log.message(f"Capture of generation {generation}:\n{capture.stop()}")
+    else:
+        generation = cfg.generations
 
-    final_best = max(population, key=lambda c: poly.eval(c.value))
-    print()
-    print(f"Best chromosome after {cfg.generations} generations: {format_chromosome(final_best, poly)}")
+    log.record(generation_record(generation, population, fitnesses, log.wants_diversity()), True)
+    if stop_reason is not None:
+        log.message(early_stop_message(stop_reason, generation, cfg.generations))
+    poly.close()
+    if cache is not None:
+        log.message(cache.report())
+    if timer is not None:
+        log.message(timer.summary())
+    log.flush()
 
 if __name__ == "__main__":
     main()
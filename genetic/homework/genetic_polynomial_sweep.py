@@ -0,0 +1,129 @@
+"""
+Batch runner for the polynomial maximization genetic algorithm - runs many configurations or seeds in parallel.
+
+Usage:
+
+The batch is described by a JSON file, which is either a list of configurations,
+or an object with a base configuration and a sweep specification:
+
+{
+    "base": "genetic_polynomial_max.json",
+    "sweep": {
+        "crossover_chance": [0.2, 0.5],
+        "mutation_chance": [0.01, 0.1],
+        "random_seed": [1, 2, 3]
+    }
+}
+
+"base" is either a path to a configuration file (relative to the batch file) or a configuration object.
+Every combination of the values in "sweep" is run, overriding the base configuration.
+
+> python genetic_polynomial_sweep.py path/to/my_sweep.json > sweep.txt
+
+Runs use the generational Python engine in quiet mode, in a process pool.
+Configurations for the numpy engine, the island model or the steady-state algorithm are rejected, since they can't be run this way.
+Finished runs are appended to a results cache file, so an interrupted sweep can be resumed without redoing them.
+"""
+
+from argparse import ArgumentParser
+from dataclasses import asdict
+from hashlib import sha256
+from itertools import product
+from json import dumps, loads
+from multiprocessing import Pool, cpu_count
+from pathlib import Path
+from typing import Any
+
+from genetic_polynomial_max import Configuration, RunResult, run_quiet
+
+def load_batch(batch_path: Path) -> list[Configuration]:
+    """
+    Load the list of configurations from a batch file, expanding the sweep specification if there is one.
+    """
+    batch = loads(batch_path.read_text(encoding='utf-8'))
+    if isinstance(batch, list):
+        raw_configs: list[dict[str, Any]] = batch
+    else:
+        base = batch["base"]
+        if isinstance(base, str):
+            base = loads((batch_path.parent / base).read_text(encoding='utf-8'))
+        sweep: dict[str, list[Any]] = batch.get("sweep", {})
+        raw_configs = [base | dict(zip(sweep.keys(), values)) for values in product(*sweep.values())]
+    configs = [Configuration(**(raw | {"verbose_first_generation": False})) for raw in raw_configs]
+    for cfg in configs:
+        if cfg.engine != "python" or cfg.islands != 1 or cfg.steady_state_replacements != 0:
+            raise ValueError(f"{batch_path} has a configuration with engine={cfg.engine!r}, islands={cfg.islands}, "
+                             f"steady_state_replacements={cfg.steady_state_replacements}, but the batch runner only runs "
+                             "the generational python engine (engine \"python\", islands 1, steady_state_replacements 0)")
+    return configs
+
+def config_key(cfg: Configuration) -> str:
+    """
+    A stable key for a configuration, used to find finished runs in the results cache.
+    """
+    return sha256(dumps(asdict(cfg), sort_keys=True).encode('utf-8')).hexdigest()
+
+def load_cache(cache_path: Path) -> dict[str, RunResult]:
+    """
+    Load the finished runs from the results cache, which has one JSON object per line.
+    An incomplete last line, from a sweep that was killed while writing, is ignored, as are results from older versions.
+    """
+    cached: dict[str, RunResult] = {}
+    if not cache_path.exists():
+        return cached
+    for line in cache_path.read_text(encoding='utf-8').splitlines():
+        try:
+            record = loads(line)
+            cached[record["key"]] = RunResult(**record["result"])
+        except (ValueError, TypeError):
+            continue
+    return cached
+
+def run_keyed(item: tuple[str, Configuration]) -> tuple[str, RunResult]:
+    """
+    Run one configuration in a worker process, returning the key with the result so results can arrive in any order.
+    The fitness is evaluated inline, since pool processes can't start their own pools, and the sweep already uses every core.
+    """
+    key, cfg = item
+    return key, run_quiet(cfg, workers=1)
+
+def format_table(configs: list[Configuration], results: dict[str, RunResult], swept: list[str]) -> str:
+    """
+    Format the results as an aligned text table, with a column for every configuration field that varies.
+    """
+    header = swept + ["best_fitness", "best_value", "best_generation", "generations_run", "wall_time_s"]
+    rows = [header]
+    for cfg in configs:
+        result = results[config_key(cfg)]
+        row = [str(getattr(cfg, field)) for field in swept]
+        row += [str(result.best_fitness), str(result.best_value), str(result.best_generation), str(result.generations_run), f"{result.elapsed_ns / 1e9:.3f}"]
+        rows.append(row)
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    return '\n'.join('  '.join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip() for row in rows)
+
+def main():
+    ap = ArgumentParser("python genetic_polynomial_sweep.py")
+    ap.add_argument("batch_JSON_path", type=Path)
+    ap.add_argument("--cache", type=Path, default=None,
+                    help="Path to the results cache (default: the batch file name with a .results.jsonl suffix)")
+    ap.add_argument("--jobs", type=int, default=cpu_count(), help="Number of worker processes")
+    args = ap.parse_args()
+    batch_path: Path = args.batch_JSON_path
+    cache_path: Path = args.cache if args.cache is not None else batch_path.with_suffix(".results.jsonl")
+    configs = load_batch(batch_path)
+    results = load_cache(cache_path)
+    todo = {config_key(cfg): cfg for cfg in configs if config_key(cfg) not in results}
+    print(f"{len(configs)} runs, {len(configs) - len(todo)} already finished in {cache_path}, running {len(todo)}")
+    if todo:
+        with Pool(max(1, min(args.jobs, len(todo)))) as pool, open(cache_path, "a", encoding='utf-8') as cache_file:
+            for key, result in pool.imap_unordered(run_keyed, todo.items()):
+                results[key] = result
+                cache_file.write(dumps({"key": key, "config": asdict(todo[key]), "result": asdict(result)}) + '\n')
+                cache_file.flush()
+                print(f"Finished {len(results)}/{len(configs)}")
+    swept = [field for field in asdict(configs[0]) if len({dumps(getattr(cfg, field)) for cfg in configs}) > 1]
+    print()
+    print(format_table(configs, results, swept))
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,8 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+import asyncio
+import os
 import random
+import re
 import subprocess
 import sys
 import time
@@ -8,17 +11,26 @@ import signal
 import typing
 from argparse import ArgumentParser
 
+if typing.TYPE_CHECKING:
+    import numpy as np
+
 @dataclass
 class IntervalProblem:
     cover_begin: int
     cover_end: int
     intervals: list[tuple[int, int]]
+    # The seed the problem was generated from, if it can be reproduced with generate_test_case_numpy.
+    seed: int | None = None
+    # The problem already formatted by the generator, so format_problem doesn't have to do it again.
+    text: str | None = field(default=None, repr=False)
 
 def format_problem(pb: IntervalProblem) -> str:
     """
     Convert the IntervalProblem to the format specified in the problem statement.
     It must be exactly like this to be parsed correctly by the solver.
     """
+    if pb.text is not None:
+        return pb.text
     test_txt = f"{pb.cover_begin} {pb.cover_end}\n"
     test_txt += f"{len(pb.intervals)}\n"
     test_txt += '\n'.join(f"{x[0]} {x[1]}" for x in pb.intervals)
@@ -58,40 +70,168 @@ def generate_test_case(params: TestGenerationParams) -> IntervalProblem:
         intervals.append((x, y))
     return IntervalProblem(cover_begin, cover_end, intervals)
 
+PRESETS = ("uniform", "dense", "sparse", "nested", "adversarial-gap")
+
+def format_pairs(begins: "np.ndarray", ends: "np.ndarray") -> str:
+    """
+    Format pairs of integers as "begin end" lines, writing the digits of all numbers at once into a preallocated byte buffer.
+    Each number gets its exact width, so the position of every digit is known from a cumulative sum of the widths.
+    """
+    import numpy as np
+    values = np.column_stack((begins, ends)).ravel().astype(np.int64)
+    negative = values < 0
+    magnitude = np.abs(values)
+    powers = 10 ** np.arange(1, 19, dtype=np.int64)
+    digits = np.searchsorted(powers, magnitude, side='right') + 1
+    # each number is followed by a space or a newline
+    widths = digits + negative + 1
+    number_ends = np.cumsum(widths)
+    buffer = np.empty(number_ends[-1], dtype=np.uint8)
+    buffer[number_ends - 1] = np.tile(np.array([ord(' '), ord('\n')], dtype=np.uint8), len(begins))
+    buffer[(number_ends - widths)[negative]] = ord('-')
+    for digit in range(int(digits.max())):
+        has_digit = digits > digit
+        buffer[number_ends[has_digit] - 2 - digit] = magnitude[has_digit] % 10 + ord('0')
+        magnitude //= 10
+    return buffer.tobytes().decode('ascii')
+
+def generate_test_case_numpy(params: TestGenerationParams, preset: str, seed: int) -> IntervalProblem:
+    """
+    Generate a test case with all endpoints drawn in batches from a NumPy Generator, so the same seed always gives the same case.
+    The presets shape the intervals:
+    - uniform: the same distribution as generate_test_case.
+    - dense: always the maximum amount of intervals.
+    - sparse: at most 1% of the maximum amount of intervals, so the range is rarely coverable.
+    - nested: intervals share a few centers, so many of them contain each other.
+    - adversarial-gap: a chain of intervals that touch without overlapping, like [1, 5] [6, 9], plus random intervals.
+      Half of the time one link is moved by one, leaving a single uncovered point that no other interval covers.
+    """
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    min_val = params.min_interval_begin
+    max_val = params.max_interval_end
+    max_amount = params.max_interval_amount
+    max_len = params.max_interval_length
+    cover_begin = min_val
+    cover_end = max_val
+    if not params.max_cover_len:
+        cover_begin += int(rng.integers(0, (max_val - min_val) // 10, endpoint=True))
+        cover_end -= int(rng.integers(0, (max_val - min_val) // 10, endpoint=True))
+
+    def uniform(amount: int) -> tuple["np.ndarray", "np.ndarray"]:
+        begins = rng.integers(min_val, max_val - 1, size=amount, endpoint=True)
+        ends = rng.integers(begins + 1, np.minimum(begins + max_len, max_val), endpoint=True)
+        return begins, ends
+
+    if preset == "uniform":
+        begins, ends = uniform(int(rng.integers(1, max_amount, endpoint=True)))
+    elif preset == "dense":
+        begins, ends = uniform(max_amount)
+    elif preset == "sparse":
+        begins, ends = uniform(int(rng.integers(1, max(1, max_amount // 100), endpoint=True)))
+    elif preset == "nested":
+        amount = int(rng.integers(1, max_amount, endpoint=True))
+        centers = rng.integers(min_val, max_val, size=max(1, amount // 100), endpoint=True)
+        center = rng.choice(centers, size=amount)
+        radius = rng.integers(1, max(1, max_len // 2), size=amount, endpoint=True)
+        begins = np.clip(center - radius, min_val, max_val - 1)
+        ends = np.maximum(np.minimum(np.minimum(center + radius, max_val), begins + max_len), begins + 1)
+    elif preset == "adversarial-gap":
+        # interval i of the chain covers lengths[i] + 1 points, the next one starts right after it
+        span = cover_end - cover_begin + 1
+        lengths = rng.integers(1, max_len, size=2 * span // (max_len + 2) + 16, endpoint=True)
+        while lengths.sum() + len(lengths) < span:
+            lengths = np.concatenate((lengths, rng.integers(1, max_len, size=len(lengths), endpoint=True)))
+        begins = cover_begin + np.concatenate(([0], np.cumsum(lengths + 1)[:-1]))
+        keep = begins <= cover_end
+        begins, lengths = begins[keep][:max_amount], lengths[keep][:max_amount]
+        ends = np.minimum(begins + lengths, max_val)
+        movable = np.flatnonzero(ends - begins >= 2)[1:]
+        gap = None
+        if len(movable) > 0 and rng.random() < 0.5:
+            moved = rng.choice(movable)
+            gap = int(begins[moved])
+            begins[moved] += 1
+        noise_begins, noise_ends = uniform(int(rng.integers(0, max_amount - len(begins), endpoint=True)))
+        if gap is not None:
+            noise = (noise_begins > gap) | (noise_ends < gap)
+            noise_begins, noise_ends = noise_begins[noise], noise_ends[noise]
+        begins = np.concatenate((begins, noise_begins))
+        ends = np.concatenate((ends, noise_ends))
+    else:
+        raise ValueError(f"Unknown preset {preset}, expected one of {', '.join(PRESETS)}")
+
+    order = rng.permutation(len(begins))
+    begins, ends = begins[order], ends[order]
+    text = f"{cover_begin} {cover_end}\n{len(begins)}\n" + format_pairs(begins, ends)
+    return IntervalProblem(cover_begin, cover_end, list(zip(begins.tolist(), ends.tolist())), seed, text)
+
 def check_is_possible(p : IntervalProblem) -> bool:
+    """
+    Check that every integer point from cover_begin to cover_end is inside one of the intervals, ends included.
+    Sorts the intervals once and sweeps over them, so the cost depends on the amount of intervals and not on the coordinates.
+    Intervals don't need to overlap, [1, 2] and [3, 4] cover [1, 4], just like in the solver.
+    """
+    rightmost_covered = p.cover_begin - 1
+    for begin, end in sorted(p.intervals):
+        if rightmost_covered >= p.cover_end:
+            break
+        if begin > rightmost_covered + 1:
+            return False
+        rightmost_covered = max(rightmost_covered, end)
+    return rightmost_covered >= p.cover_end
+
+def minimum_cover(p: IntervalProblem) -> list[int] | None:
+    """
+    Reference greedy solution: repeatedly pick the interval that starts at most one past the covered prefix and reaches furthest.
+    Returns the 1-based indexes of a minimum cover, or None if the range can't be covered.
+    """
+    order = sorted(range(len(p.intervals)), key=lambda index: p.intervals[index][0])
     rightmost_covered = p.cover_begin - 1
-    intervals = sorted(p.intervals)
     scan = 0
-    for cover in range(p.cover_begin, p.cover_end + 1):
-        if cover <= rightmost_covered:
-            continue
-        while True:
-            if scan >= len(intervals) or intervals[scan][0] > cover:
-                return False
-            if cover <= intervals[scan][1]:
-                rightmost_covered = intervals[scan][1]
-                break
+    chosen: list[int] = []
+    while rightmost_covered < p.cover_end:
+        best_end = rightmost_covered
+        best_index = -1
+        while scan < len(order) and p.intervals[order[scan]][0] <= rightmost_covered + 1:
+            if p.intervals[order[scan]][1] > best_end:
+                best_end = p.intervals[order[scan]][1]
+                best_index = order[scan]
             scan += 1
-    return True
+        if best_index == -1:
+            return None
+        rightmost_covered = best_end
+        chosen.append(best_index + 1)
+    return chosen
 
-def make_file_for_next_test(tests_folder: pathlib.Path, counter_file_name: str) -> tuple[int, pathlib.Path]:
+def read_test_counter(tests_folder: pathlib.Path, counter_file_name: str) -> int:
+    """
+    Read the number of the last test from a previous run, or 0 if there is no counter file.
+    The counter is then kept in memory, and only written back by save_failing_test and at shutdown.
+    """
     counter_file = tests_folder / counter_file_name
-    if not tests_folder.exists():
-        tests_folder.mkdir()
     if not counter_file.exists():
-        counter_file.write_text("0\n")
+        return 0
     counter_txt = counter_file.read_text(encoding='ascii')
     try:
-        last_test = int(counter_txt)
+        return int(counter_txt)
     except ValueError as e:
         raise ValueError(f"File {counter_file} contains non-integer data: {counter_txt}") from e
-    this_test = last_test + 1
-    counter_file.write_text(f"{this_test}\n")
-    new_test_file = tests_folder / f"test_{this_test}.txt"
-    if new_test_file.exists():
-        raise FileExistsError(f"Test file {new_test_file} already exists")
-    new_test_file.touch()
-    return this_test, new_test_file
+
+def write_test_counter(tests_folder: pathlib.Path, counter_file_name: str, last_test: int):
+    tests_folder.mkdir(exist_ok=True)
+    (tests_folder / counter_file_name).write_text(f"{last_test}\n", encoding='ascii')
+
+def save_failing_test(tests_folder: pathlib.Path, counter_file_name: str, test_nr: int, test: IntervalProblem) -> pathlib.Path:
+    """
+    Write the input of a failing test to test_N.txt, and the counter along with it, so the numbering continues in the next run.
+    """
+    write_test_counter(tests_folder, counter_file_name, test_nr)
+    test_file = tests_folder / f"test_{test_nr}.txt"
+    if test_file.exists():
+        raise FileExistsError(f"Test file {test_file} already exists")
+    test_file.write_text(format_problem(test), encoding='ascii')
+    return test_file
 
 @dataclass
 class TestResult:
@@ -100,14 +240,45 @@ class TestResult:
     message: str
     failed: bool
 
-def run_one_test(input_file_path: pathlib.Path, test: IntervalProblem, solver_path: pathlib.Path) -> TestResult:
-    input_file_path.write_text(format_problem(test), encoding='ascii')
+def run_one_test(test: IntervalProblem, solver_path: pathlib.Path) -> TestResult:
+    """
+    Run the solver on a test, piping the input from memory, and check its output.
+    """
+    test_txt = format_problem(test)
+    start_time = time.perf_counter_ns()
+    process = subprocess.run(solver_path, input=test_txt, capture_output=True, check=False, text=True)
+    elapsed_time = time.perf_counter_ns() - start_time
+
+    return check_output(test, process, elapsed_time)
 
-    with open(input_file_path, 'r', encoding='ascii') as input_file_handle:
-        start_time = time.perf_counter_ns()
-        process = subprocess.run(solver_path, stdin=input_file_handle, capture_output=True, check=False, text=True)
-        elapsed_time = time.perf_counter_ns() - start_time
+async def run_one_test_async(test: IntervalProblem, solver_path: pathlib.Path) -> TestResult:
+    """
+    Same as run_one_test, but the solver runs as an asyncio subprocess, so many tests can run at once.
+    If the task is cancelled, the solver is killed before the cancellation propagates.
+    """
+    test_txt = format_problem(test).encode('ascii')
+    start_time = time.perf_counter_ns()
+    solver = await asyncio.create_subprocess_exec(solver_path, stdin=asyncio.subprocess.PIPE,
+                                                  stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+    try:
+        stdout, stderr = await solver.communicate(test_txt)
+    except asyncio.CancelledError:
+        try:
+            solver.kill()
+        except ProcessLookupError:
+            # the solver already exited, but its output wasn't collected yet
+            pass
+        await solver.wait()
+        raise
+    elapsed_time = time.perf_counter_ns() - start_time
+
+    process = subprocess.CompletedProcess(solver_path, solver.returncode, stdout.decode(errors='replace'), stderr.decode(errors='replace'))
+    return check_output(test, process, elapsed_time)
 
+def check_output(test: IntervalProblem, process: subprocess.CompletedProcess[str], elapsed_time: int) -> TestResult:
+    """
+    Check the output of the solver for a test, and build the result.
+    """
     def mk_fail(msg: str) -> TestResult:
         return TestResult(elapsed_time, process, msg, True)
 
@@ -128,9 +299,13 @@ def run_one_test(input_file_path: pathlib.Path, test: IntervalProblem, solver_pa
     if len(output_lines) != 2:
         return mk_fail("Line 1 doesn't match number of indexes on line 2")
 
-    output_len = int(output_lines[0])
-    output_indexes = [int(x) for x in output_lines[1].split()]
-    assert output_len == len(output_indexes)
+    try:
+        output_len = int(output_lines[0])
+        output_indexes = [int(x) for x in output_lines[1].split()]
+    except ValueError:
+        return mk_fail("Malformed output, expected integers")
+    if output_len != len(output_indexes):
+        return mk_fail(f"Line 1 says {output_len} indexes, but line 2 has {len(output_indexes)}")
 
     chosen_intervals: list[tuple[int, int]] = []
     for index in output_indexes:
@@ -145,9 +320,229 @@ def run_one_test(input_file_path: pathlib.Path, test: IntervalProblem, solver_pa
     if not check_is_possible(chosen_solution):
         return mk_fail(f"Incorrectly chose {output_len} intervals, does not cover the interval")
 
+    reference = minimum_cover(test)
+    assert reference is not None
+    if output_len > len(reference):
+        return mk_fail(f"Chose {output_len} intervals that cover the interval, but the minimum is {len(reference)}")
+
     return mk_success(f"Correctly chose {output_len} intervals")
 
-def test_forever(solver_path: pathlib.Path, tests_dir: pathlib.Path, tests_counter: str, params: TestGenerationParams, test_limit: int) -> typing.NoReturn:
+def tester_error(solver_path: pathlib.Path, error: Exception) -> TestResult:
+    """
+    The result of a test the tester itself failed on, for example because the solver couldn't be started.
+    It counts as a failure, so the input is still saved.
+    """
+    return TestResult(0, subprocess.CompletedProcess(solver_path, -1, "", ""), f"Tester error: {error!r}", True)
+
+def print_result(tests_dir: pathlib.Path, tests_counter: str, test_nr: int, test: IntervalProblem, result: TestResult):
+    """
+    Print the result of a test that wasn't canceled.
+    Only a failing test is written to disk, its input along with the output if there is any.
+    """
+    print(f"Elapsed: {result.elapsed_ns / 1e9:.3f} seconds")
+
+    if result.failed:
+        print(f"Exit code: {result.process.returncode}")
+        print(f"Failure: {result.message}")
+        if test.seed is not None:
+            print(f"Generated from seed {test.seed}, reproduce with --case_seed {test.seed}")
+        if len(result.process.stderr):
+            print(f"Process stderr: {result.process.stderr.strip()}")
+        else:
+            print("No stderr output")
+        input_file_path = save_failing_test(tests_dir, tests_counter, test_nr, test)
+        print(f"Saved input to {input_file_path}")
+        if len(result.process.stdout):
+            output_file = input_file_path.with_name(input_file_path.stem + ".out.txt")
+            output_file.write_text(result.process.stdout)
+            print(f"Saved output to {output_file}")
+        else:
+            print("No stdout output")
+        return
+
+    print(f"Success: {result.message}")
+    print()
+
+def failure_signature(result: TestResult) -> tuple[int, str]:
+    """
+    What has to stay the same for a smaller test to count as the same failure.
+    A crash is identified by the exit code and the first line of stderr, which names the failed assertion in the solver.
+    A wrong answer is identified by the failure message without the numbers in it, since they change as the test shrinks.
+    """
+    if result.process.returncode != 0:
+        stderr = result.process.stderr.strip()
+        return result.process.returncode, stderr.split('\n')[0]
+    return 0, re.sub(r"-?\d+", "N", result.message)
+
+def compress_coordinates(p: IntervalProblem) -> IntervalProblem:
+    """
+    Move all coordinates closer together without changing which integer points each interval covers relative to the others:
+    consecutive distinct coordinates that are adjacent stay adjacent, and any larger gap becomes a gap of exactly one point.
+    """
+    coordinates = sorted({p.cover_begin, p.cover_end} | {x for interval in p.intervals for x in interval})
+    new_coordinate = {coordinates[0]: coordinates[0]}
+    for previous, current in zip(coordinates, coordinates[1:]):
+        new_coordinate[current] = new_coordinate[previous] + min(current - previous, 2)
+    return IntervalProblem(new_coordinate[p.cover_begin], new_coordinate[p.cover_end], [(new_coordinate[x], new_coordinate[y]) for x, y in p.intervals])
+
+def tighten_cover(p: IntervalProblem) -> IntervalProblem:
+    """
+    Shrink the range to cover to the part of it that the intervals touch.
+    """
+    begin = max(p.cover_begin, min(x for x, _ in p.intervals))
+    end = min(p.cover_end, max(y for _, y in p.intervals))
+    if begin >= end:
+        return p
+    return IntervalProblem(begin, end, p.intervals)
+
+def shrink_cover(p: IntervalProblem) -> list[IntervalProblem]:
+    """
+    Move the start or the end of the range to cover inward, by half of the range, then a quarter, and so on down to one point.
+    Largest moves come first, so the first one that reproduces is taken.
+    """
+    candidates: list[IntervalProblem] = []
+    step = (p.cover_end - p.cover_begin) // 2
+    while step >= 1:
+        candidates.append(IntervalProblem(p.cover_begin + step, p.cover_end, p.intervals))
+        candidates.append(IntervalProblem(p.cover_begin, p.cover_end - step, p.intervals))
+        step //= 2
+    return candidates
+
+async def minimize_test(test: IntervalProblem, result: TestResult, solver_path: pathlib.Path, jobs: int,
+                        is_signaled: typing.Callable[[], bool]) -> IntervalProblem:
+    """
+    Shrink a failing test while it still fails with the same failure_signature, with delta debugging (ddmin).
+    First, chunks of intervals are removed: the intervals are split into n chunks, and each chunk alone, then everything except each chunk,
+    is tried. A reproducing candidate becomes the new test, otherwise n doubles, until the chunks are single intervals.
+    Then the coordinates are shrunk with compress_coordinates, tighten_cover and shrink_cover, while that still reproduces.
+    A smaller range may need fewer intervals, so both phases repeat until neither makes progress.
+    Candidates run jobs at a time in parallel solvers, and the first reproducing one in order is kept, so the result is deterministic.
+    Candidates are only accepted if they are valid inputs inside the coordinates of the original test, so a crash on invalid input
+    can't be mistaken for the original failure. An interrupt stops the minimization, keeping the smallest test found so far.
+    """
+    target = failure_signature(result)
+    low = min(test.cover_begin, min(x for x, _ in test.intervals))
+    high = max(test.cover_end, max(y for _, y in test.intervals))
+
+    def is_valid(p: IntervalProblem) -> bool:
+        return (len(p.intervals) > 0 and low <= p.cover_begin < p.cover_end <= high
+                and all(low <= x < y <= high for x, y in p.intervals))
+
+    async def first_reproducing(amount: int, candidate: typing.Callable[[int], IntervalProblem]) -> IntervalProblem | None:
+        for start in range(0, amount, jobs):
+            if is_signaled():
+                return None
+            batch = [candidate(index) for index in range(start, min(start + jobs, amount))]
+            batch = [p for p in batch if is_valid(p)]
+            results = await asyncio.gather(*[run_one_test_async(p, solver_path) for p in batch], return_exceptions=True)
+            for p, r in zip(batch, results):
+                # an error in the tester isn't the same failure
+                if not isinstance(r, BaseException) and r.failed and failure_signature(r) == target:
+                    return p
+        return None
+
+    async def remove_intervals(current: IntervalProblem) -> IntervalProblem:
+        chunks = 2
+        while len(current.intervals) >= 2 and not is_signaled():
+            intervals = current.intervals
+            chunk_len = -(-len(intervals) // chunks)
+            starts = list(range(0, len(intervals), chunk_len))
+
+            def candidate(index: int) -> IntervalProblem:
+                if index < len(starts):
+                    kept = intervals[starts[index]:starts[index] + chunk_len]
+                else:
+                    start = starts[index - len(starts)]
+                    kept = intervals[:start] + intervals[start + chunk_len:]
+                return IntervalProblem(current.cover_begin, current.cover_end, kept)
+
+            found = await first_reproducing(2 * len(starts), candidate)
+            if found is not None:
+                # a single chunk restarts with 2 chunks, a complement keeps the same chunk size
+                chunks = 2 if len(found.intervals) <= chunk_len else max(chunks - 1, 2)
+                current = found
+            elif chunks >= len(intervals):
+                break
+            else:
+                chunks = min(chunks * 2, len(intervals))
+        return current
+
+    current = IntervalProblem(test.cover_begin, test.cover_end, list(test.intervals))
+    while not is_signaled():
+        current = await remove_intervals(current)
+        shrunk_coordinates = False
+        while not is_signaled():
+            shrunk = [compress_coordinates(current), tighten_cover(current)] + shrink_cover(current)
+            shrunk = [p for p in shrunk if p.cover_begin != current.cover_begin or p.cover_end != current.cover_end or p.intervals != current.intervals]
+            found = await first_reproducing(len(shrunk), shrunk.__getitem__)
+            if found is None:
+                break
+            current = found
+            shrunk_coordinates = True
+        if not shrunk_coordinates:
+            break
+    return current
+
+async def test_parallel(solver_path: pathlib.Path, tests_dir: pathlib.Path, tests_counter: str, generate: typing.Callable[[], IntervalProblem], test_limit: int,
+                        jobs: int, last_test: int, is_signaled: typing.Callable[[], bool], interrupted: asyncio.Event,
+                        failures: list[tuple[int, IntervalProblem, TestResult]]) -> int:
+    """
+    Keep up to jobs solvers running at once, until a test fails, the test limit is reached, or the interrupted event is set.
+    Tests are generated and numbered in the order they are started, and reported in that order, so the numbering is deterministic.
+    On the first failure or interrupt, every test still running is canceled, which kills its solver.
+    Failing tests are added to failures. Returns the number of the last test started.
+    """
+    running: dict[int, tuple[IntervalProblem, asyncio.Task[TestResult]]] = {}
+    started = 0
+
+    async def run_checked(test: IntervalProblem) -> TestResult:
+        try:
+            return await run_one_test_async(test, solver_path)
+        except Exception as error:
+            return tester_error(solver_path, error)
+    stopping = False
+    interrupted_wait = asyncio.create_task(interrupted.wait())
+
+    def report_finished():
+        for test_nr in sorted(running):
+            test, task = running[test_nr]
+            if not task.done():
+                break
+            del running[test_nr]
+            print(f"Test {test_nr}:")
+            if task.cancelled() or (is_signaled() and task.result().failed):
+                # Failure is probably due to subprocess inheriting the SIGINT signal
+                print("Canceled")
+                continue
+            print_result(tests_dir, tests_counter, test_nr, test, task.result())
+            if task.result().failed:
+                failures.append((test_nr, test, task.result()))
+
+    while True:
+        while not stopping and len(running) < jobs:
+            if 0 < test_limit <= started:
+                break
+            started += 1
+            last_test += 1
+            test = generate()
+            running[last_test] = (test, asyncio.create_task(run_checked(test)))
+        if not running:
+            break
+        await asyncio.wait([task for _, task in running.values()] + [interrupted_wait], return_when=asyncio.FIRST_COMPLETED)
+        failed = any(task.done() and not task.cancelled() and task.result().failed for _, task in running.values())
+        if failed or is_signaled():
+            stopping = True
+            for _, task in running.values():
+                task.cancel()
+            await asyncio.gather(*[task for _, task in running.values()], return_exceptions=True)
+        report_finished()
+    interrupted_wait.cancel()
+    if 0 < test_limit <= started and not stopping:
+        print(f"Reached test limit of {test_limit}, stopping")
+    return last_test
+
+def test_forever(solver_path: pathlib.Path, tests_dir: pathlib.Path, tests_counter: str, generate: typing.Callable[[], IntervalProblem], test_limit: int,
+                 jobs: int = 1, minimize_jobs: int = 0) -> typing.NoReturn:
     signaled = False
 
     def set_signaled():
@@ -159,44 +554,54 @@ def test_forever(solver_path: pathlib.Path, tests_dir: pathlib.Path, tests_count
 
     signal.signal(signal.SIGINT, lambda _1, _2 : set_signaled())
 
+    async def run_parallel():
+        loop = asyncio.get_running_loop()
+        interrupted = asyncio.Event()
+        def wake_on_signal():
+            set_signaled()
+            loop.call_soon_threadsafe(interrupted.set)
+        signal.signal(signal.SIGINT, lambda _1, _2 : wake_on_signal())
+        return await test_parallel(solver_path, tests_dir, tests_counter, generate, test_limit, jobs, last_test, lambda: signaled, interrupted, failures)
+
+    failures: list[tuple[int, IntervalProblem, TestResult]] = []
+    last_test = read_test_counter(tests_dir, tests_counter)
     tests = 0
-    while not signaled:
+    if jobs > 1:
+        last_test = asyncio.run(run_parallel())
+    while jobs == 1 and not signaled:
         tests += 1
         if 0 < test_limit < tests:
             print(f"Reached test limit of {test_limit}, stopping")
             break
-        test = generate_test_case(params)
-        test_nr, input_file_path = make_file_for_next_test(tests_dir, tests_counter)
-        result = run_one_test(input_file_path, test, solver_path)
-        print(f"Test {test_nr}:")
+        test = generate()
+        last_test += 1
+        try:
+            result = run_one_test(test, solver_path)
+        except Exception as error:
+            result = tester_error(solver_path, error)
+        print(f"Test {last_test}:")
         if signaled and result.failed:
             # Failure is probably due to subprocess inheriting the SIGINT signal
             print("Canceled")
-            input_file_path.unlink()
             break
-        print(f"Elapsed: {result.elapsed_ns / 1e9:.3f} seconds")
-
+        print_result(tests_dir, tests_counter, last_test, test, result)
         if result.failed:
-            print(f"Exit code: {result.process.returncode}")
-            print(f"Failure: {result.message}")
-            if len(result.process.stderr):
-                print(f"Process stderr: {result.process.stderr.strip()}")
-            else:
-                print("No stderr output")
-            print(f"Saved input to {input_file_path}")
-            if len(result.process.stdout):
-                output_file = input_file_path.with_name(input_file_path.stem + ".out.txt")
-                output_file.write_text(result.process.stdout)
-                print(f"Saved output to {output_file}")
-            else:
-                print("No stdout output")
+            failures.append((last_test, test, result))
             break
 
-        print(f"Success: {result.message}")
-        print()
-        input_file_path.unlink()
-
     print("Testing stopped")
+    signal.signal(signal.SIGINT, lambda _1, _2 : set_signaled())
+    for test_nr, test, result in failures:
+        if minimize_jobs == 0 or signaled:
+            break
+        print(f"Minimizing test {test_nr} with {minimize_jobs} parallel solvers, interrupt to stop early")
+        minimized = asyncio.run(minimize_test(test, result, solver_path, minimize_jobs, lambda: signaled))
+        minimized_file = tests_dir / f"test_{test_nr}.min.txt"
+        minimized_file.write_text(format_problem(minimized), encoding='ascii')
+        print(f"Minimized from {len(test.intervals)} to {len(minimized.intervals)} intervals, saved to {minimized_file}")
+    if not tests_dir.exists():
+        print(f"No failing test files were stored, {tests_dir} was not created")
+        sys.exit(0)
     files = list(tests_dir.iterdir())
     if (len(files) == 1 and files[0].name == tests_counter) or len(files) == 0:
         print(f"No failing test files seem to be stored in {tests_dir}, removing it")
@@ -206,6 +611,8 @@ def test_forever(solver_path: pathlib.Path, tests_dir: pathlib.Path, tests_count
         tests_dir.rmdir()
     else:
         print(f"Not removing {tests_dir}, it seems to contain files, probably failing tests")
+        print(f"Saving test number counter {last_test} to {tests_dir / tests_counter}")
+        write_test_counter(tests_dir, tests_counter, last_test)
     sys.exit(0)
 
 def main():
@@ -218,13 +625,35 @@ def main():
     ap.add_argument("--max_interval_length", help="Maximum length of an interval", type=int, default=200)
     ap.add_argument("--max_cover", help="Always test covering the entire interval", action="store_true", default=False)
     ap.add_argument("--test_limit", help="Maximum amount of tests to run (0 = unlimited)", type=int, default=0)
+    ap.add_argument("--jobs", help="Amount of solvers to run at once", type=int, default=1)
+    ap.add_argument("--preset", help="Generate tests with NumPy using this distribution", type=str, choices=PRESETS, default=None)
+    ap.add_argument("--seed", help="Seed for the seeds of the tests generated with --preset (default: random)", type=int, default=None)
+    ap.add_argument("--case_seed", help="Run only the test generated with --preset from this seed", type=int, default=None)
+    ap.add_argument("--minimize_jobs", help="Amount of solvers to run at once when minimizing a failing test (0 = don't minimize)",
+                    type=int, default=os.cpu_count() or 1)
     args = ap.parse_args()
+    if args.jobs < 1:
+        raise ValueError("jobs must be positive")
+    if args.minimize_jobs < 0:
+        raise ValueError("minimize_jobs must not be negative")
+    if args.preset is None and (args.seed is not None or args.case_seed is not None):
+        raise ValueError("seed and case_seed require a preset")
+    if args.preset is not None and args.seed is None:
+        args.seed = random.getrandbits(63)
     print(args)
     params = TestGenerationParams(args.min_interval_begin, args.max_interval_end, args.max_interval_amount, args.max_interval_length, args.max_cover)
     tests_dir = pathlib.Path(args.test_dir).absolute()
     solver = pathlib.Path(args.solver).absolute()
     test_limit: int = args.test_limit
-    test_forever(solver, tests_dir, "test_counter.txt", params, test_limit)
+    generate: typing.Callable[[], IntervalProblem] = lambda: generate_test_case(params)
+    if args.case_seed is not None:
+        test_limit = 1
+        generate = lambda: generate_test_case_numpy(params, args.preset, args.case_seed)
+    elif args.preset is not None:
+        # each test gets its own seed, so a failing test can be reproduced alone
+        seeds = random.Random(args.seed)
+        generate = lambda: generate_test_case_numpy(params, args.preset, seeds.getrandbits(63))
+    test_forever(solver, tests_dir, "test_counter.txt", generate, test_limit, args.jobs, args.minimize_jobs)
 
 if __name__ == "__main__":
     main()